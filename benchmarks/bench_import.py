@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Import time benchmark.
+
+Every scenario is timed in a fresh interpreter. 'eager' additionally imports
+all libraries the serializer backends and argparse actions need, i.e. what
+`import tunable` used to pull in before these were loaded on first use.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from common import ROOT
+
+EAGER_IMPORTS = [
+    'argparse',
+    'hashlib',
+    'json',
+    'xml.etree.ElementTree',
+    'yaml',
+    'pyasn1.codec.der.decoder',
+    'pyasn1.codec.der.encoder',
+    'pyasn1.codec.native.encoder',
+    'tunable.schema.tunable_schema',
+    'tunable.argparseactions',
+]
+
+SCENARIOS = {
+    'import': "import tunable",
+    'import_and_value': (
+        "import tunable\n"
+        "class SomeTunable(tunable.Tunable):\n"
+        "    default = 1.0\n"
+        "SomeTunable.value"
+    ),
+    'eager': "import tunable\n"
+    + "\n".join(
+        "try:\n    import %s\nexcept ImportError:\n    pass" % (module,)
+        for module in EAGER_IMPORTS
+    ),
+}
+
+_TEMPLATE = '''
+import sys, time
+_before = len(sys.modules)
+_start = time.perf_counter()
+%s
+_stop = time.perf_counter()
+print(_stop - _start, len(sys.modules) - _before)
+'''
+
+
+def measure(statement, repeat=20):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [ROOT] + ([env['PYTHONPATH']] if env.get('PYTHONPATH') else [])
+    )
+
+    times, modules = [], 0
+    for _ in range(repeat):
+        output = subprocess.check_output(
+            [sys.executable, '-c', _TEMPLATE % (statement,)], env=env
+        )
+        seconds, modules = output.split()
+        times.append(float(seconds))
+
+    return {
+        'min': min(times),
+        'median': statistics.median(times),
+        'modules': int(modules),
+        'repeat': repeat,
+    }
+
+
+def run(quick=False, repeat=None):
+    repeat = repeat or (5 if quick else 20)
+    results = {
+        'import.%s' % (name,): measure(statement, repeat=repeat)
+        for name, statement in SCENARIOS.items()
+    }
+    results['import.reduction'] = {
+        'factor': results['import.eager']['median'] / results['import.import']['median']
+    }
+    return results
+
+
+if __name__ == '__main__':
+    json.dump(run(), sys.stdout, indent=4, sort_keys=True)
+    print()
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+TunableManager benchmarks on generated registries of different sizes.
+"""
+
+import json
+import sys
+
+from common import curve, generate_tunables, isolated, measure
+
+SIZES = [10, 100, 1000, 10000]
+QUICK_SIZES = [10, 100, 1000]
+
+
+def bench_registry(size):
+    from tunable import TunableManager
+
+    names = generate_tunables(size)
+    TunableManager.init()
+
+    values = {name: getattr(TunableManager.lookup(name), 'default') for name in names}
+    # bytes can not be converted from str
+    strings = {
+        name: str(value) for name, value in values.items() if type(value) is not bytes
+    }
+    key = names[len(names) // 2]
+
+    counter = [0]
+
+    def change_one():
+        counter[0] += 1
+        TunableManager.set(key, counter[0])
+
+    def change_one_and_hash():
+        change_one()
+        TunableManager.get_hash()
+
+    def rebuild_hash():
+        TunableManager._hash_value = None
+        TunableManager._hash_generation = None
+        TunableManager.get_hash()
+
+    return {
+        'load': measure(lambda: TunableManager.load(values), repeat=3),
+        'load_no_reset': measure(
+            lambda: TunableManager.load(values, reset=False), repeat=3
+        ),
+        'load_strings': measure(lambda: TunableManager.load(strings), repeat=3),
+        'set': measure(lambda: TunableManager.set(key, 1)),
+        'get_hash.unchanged': measure(TunableManager.get_hash),
+        'get_hash.one_changed': measure(change_one_and_hash),
+        'get_hash.full': measure(rebuild_hash, repeat=3),
+    }
+
+
+def run(quick=False):
+    sizes = QUICK_SIZES if quick else SIZES
+
+    per_size = {size: isolated(bench_registry, size) for size in sizes}
+
+    results = {}
+    for name in per_size[sizes[0]]:
+        results.update(
+            curve(
+                'manager.%s' % (name,),
+                {size: timings[name] for size, timings in per_size.items()},
+            )
+        )
+
+    return results
+
+
+if __name__ == '__main__':
+    json.dump(run(), sys.stdout, indent=4, sort_keys=True)
+    print()
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+SelectableManager benchmarks on deep and wide Selectable hierarchies.
+"""
+
+import json
+import sys
+
+from common import curve, isolated, measure
+
+DEPTHS = [1, 10, 100]
+WIDTHS = [10, 100, 1000]
+QUICK_WIDTHS = [10, 100]
+
+
+def _hierarchy(depth, width):
+    from tunable import Selectable
+
+    class Root(Selectable):
+        def __init__(self, value=0):
+            self.value = value
+
+    class Implementation(Root, Root.Default):
+        pass
+
+    leaf = Implementation
+    for n in range(depth - 1):
+        leaf = type('Deep%d' % (n,), (leaf,), {})
+
+    # keep references, __subclasses__() only holds weak ones
+    Root.choices = [type('Choice%d' % (n,), (Root,), {}) for n in range(width)]
+
+    return Root, leaf
+
+
+def bench_hierarchy(depth, width):
+    from tunable import SelectableManager
+
+    root, leaf = _hierarchy(depth, width)
+
+    return {
+        'resolve_selectable': measure(
+            lambda: SelectableManager.resolve_selectable(leaf)
+        ),
+        'create_selectable.root': measure(
+            lambda: SelectableManager.create_selectable(root, (), {})
+        ),
+        'create_selectable.leaf': measure(
+            lambda: SelectableManager.create_selectable(leaf, (), {'value': 1})
+        ),
+        'set': measure(lambda: SelectableManager.set(root, 'Choice0')),
+        'get_choice_for_string': measure(
+            lambda: SelectableManager.get_choice_for_string(root, 'Choice0')
+        ),
+    }
+
+
+def bench_definition(width):
+    import time
+
+    start = time.perf_counter()
+    _hierarchy(1, width)
+    return {'median': time.perf_counter() - start, 'number': 1}
+
+
+def run(quick=False):
+    widths = QUICK_WIDTHS if quick else WIDTHS
+
+    results = {}
+
+    per_depth = {depth: isolated(bench_hierarchy, depth, widths[0]) for depth in DEPTHS}
+    per_width = {width: isolated(bench_hierarchy, 1, width) for width in widths}
+
+    for name in per_depth[DEPTHS[0]]:
+        results.update(
+            curve(
+                'selectable.depth.%s' % (name,),
+                {depth: timings[name] for depth, timings in per_depth.items()},
+            )
+        )
+        results.update(
+            curve(
+                'selectable.width.%s' % (name,),
+                {width: timings[name] for width, timings in per_width.items()},
+            )
+        )
+
+    results.update(
+        curve(
+            'selectable.define',
+            {width: isolated(bench_definition, width) for width in widths},
+        )
+    )
+
+    return results
+
+
+if __name__ == '__main__':
+    json.dump(run(), sys.stdout, indent=4, sort_keys=True)
+    print()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks of every entry in SERIALIZERS, in both directions.
+"""
+
+import json
+import sys
+from io import BytesIO, StringIO
+
+from common import DEFAULTS, generate_tunables, measure
+
+from tunable import TunableManager
+from tunable.tunablemanager import SERIALIZERS
+
+
+def bench_serializer(extension):
+    try:
+        serializer = SERIALIZERS[extension]()
+    except RuntimeError as e:
+        return {'skipped': str(e)}
+
+    buffer_class = BytesIO if serializer.need_binary else StringIO
+
+    tunables = TunableManager.get_semilong_dict()
+    representation = TunableManager.get_representation()
+
+    def serialize():
+        buffer = buffer_class()
+        serializer.serialize(buffer, tunables=tunables, representation=representation)
+        return buffer.getvalue()
+
+    data = serialize()
+
+    return {
+        'serialize': measure(serialize),
+        'deserialize': measure(lambda: serializer.deserialize(buffer_class(data))),
+        'size': len(data),
+    }
+
+
+def run(quick=False, count=None):
+    # not every format supports bytes
+    generate_tunables(
+        count or (100 if quick else 1000),
+        defaults=[default for default in DEFAULTS if type(default) is not bytes],
+    )
+    TunableManager.init()
+
+    results = {}
+    for extension in sorted(SERIALIZERS):
+        timings = bench_serializer(extension)
+        if 'skipped' in timings:
+            results['serializer.%s' % (extension,)] = timings
+            continue
+        for direction in ('serialize', 'deserialize'):
+            results['serializer.%s.%s' % (extension, direction)] = timings[direction]
+        results['serializer.%s.size' % (extension,)] = {'bytes': timings['size']}
+
+    return results
+
+
+if __name__ == '__main__':
+    json.dump(run(), sys.stdout, indent=4, sort_keys=True)
+    print()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Tunable.value and Tunable.set benchmarks.
+"""
+
+import json
+import sys
+
+from common import measure
+
+from tunable import Interval, Tunable
+
+
+def _fresh_tunables(count, default=1.0):
+    return [
+        type('ValueTunable%d' % (n,), (Tunable,), dict(default=default))
+        for n in range(count)
+    ]
+
+
+def bench_first_value(count=10000):
+    pending = []
+
+    def setup():
+        pending[:] = _fresh_tunables(count)
+
+    def first_access():
+        pending.pop().value
+
+    return measure(first_access, number=count, setup=setup)
+
+
+def bench_repeated_value():
+    class RepeatedValue(Tunable):
+        default = 1.0
+
+    RepeatedValue.value
+
+    return measure(lambda: RepeatedValue.value)
+
+
+def bench_set(value, default, **attributes):
+    class SetTunable(Tunable):
+        default = 1.0
+
+    SetTunable.default = default
+
+    for name, attribute in attributes.items():
+        setattr(SetTunable, name, attribute)
+
+    return measure(lambda: SetTunable.set(value))
+
+
+def run(quick=False):
+    count = 1000 if quick else 10000
+
+    return {
+        'tunable.value.first': bench_first_value(count),
+        'tunable.value.repeated': bench_repeated_value(),
+        'tunable.set.same_type': bench_set(2.0, 1.0),
+        'tunable.set.convert_str_float': bench_set('2.0', 1.0),
+        'tunable.set.convert_int_float': bench_set(2, 1.0),
+        'tunable.set.convert_str_bool': bench_set('yes', True),
+        'tunable.set.range': bench_set(50, 1, range=range(0, 100)),
+        'tunable.set.range_float': bench_set(50.0, 1.0, range=range(0, 100)),
+        'tunable.set.range_set': bench_set(50, 1, range=set(range(100))),
+        'tunable.set.range_list': bench_set(50, 1, range=list(range(100))),
+        'tunable.set.range_interval': bench_set(50.0, 1.0, range=Interval(0.0, 100.0)),
+        'tunable.set.test': bench_set(
+            2.0, 1.0, test=classmethod(lambda cls, value: value > 0)
+        ),
+    }
+
+
+if __name__ == '__main__':
+    json.dump(run(), sys.stdout, indent=4, sort_keys=True)
+    print()
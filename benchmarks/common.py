@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Helpers shared by the benchmark modules.
+"""
+
+import math
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def measure(func, number=None, repeat=5, setup=None):
+    """
+    Time func(), returns seconds per call (min and median over repeat runs).
+    If number is None, it is chosen so that one run takes roughly 0.1 s.
+    setup() is called before every run and not timed.
+    """
+    if number is None:
+        number = 1
+        while True:
+            if setup:
+                setup()
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            if time.perf_counter() - start > 0.1 or number >= 1 << 20:
+                break
+            number *= 4
+
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+
+    return {
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'number': number,
+        'repeat': repeat,
+    }
+
+
+def isolated(func, *args):
+    """Run func(*args) in a fresh interpreter, so registries do not interfere."""
+    with ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context('spawn')
+    ) as executor:
+        return executor.submit(func, *args).result()
+
+
+def scaling(results, key='median'):
+    """
+    Fit the exponent of time ~ size**k from {size: timing},
+    k around 1 means linear, around 2 quadratic behaviour.
+    """
+    points = [
+        (math.log(size), math.log(timing[key]))
+        for size, timing in sorted(results.items())
+        if timing[key] > 0
+    ]
+
+    if len(points) < 2:
+        return None
+
+    mean_x = statistics.mean(x for x, _ in points)
+    mean_y = statistics.mean(y for _, y in points)
+
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / sum(
+        (x - mean_x) ** 2 for x, _ in points
+    )
+
+
+def curve(name, results):
+    """Flatten {size: timing} into result entries plus the fitted exponent."""
+    flattened = {'%s.%d' % (name, size): timing for size, timing in results.items()}
+    flattened['%s.scaling' % (name,)] = {
+        'exponent': scaling(results),
+        'sizes': sorted(results),
+    }
+    return flattened
+
+
+DEFAULTS = [1, 1.5, 'text', True, b'bytes']
+
+
+def generate_tunables(count, module='generated', defaults=DEFAULTS):
+    """Define count tunables of mixed types in module, returns their names."""
+    from tunable import Tunable
+
+    names = []
+
+    for n in range(count):
+        class_ = type(
+            'Tunable%d' % (n,),
+            (Tunable,),
+            dict(default=defaults[n % len(defaults)], __module__=module),
+        )
+        names.append(module + '.' + class_.__name__)
+
+    return names
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Run the benchmark suite, results are written as JSON.
+
+    python benchmarks/run.py [--quick] [--output results.json]
+    python benchmarks/run.py --compare baseline.json [--threshold 1.25]
+
+With --compare, every timing whose median got slower than threshold times
+the baseline, and every scaling exponent which grew by more than 0.5,
+is reported and the exit code is non-zero.
+"""
+
+import argparse
+import json
+import platform
+import sys
+
+import bench_import
+import bench_manager
+import bench_selectable
+import bench_serializers
+import bench_tunable
+from common import isolated
+
+MODULES = {
+    'import': bench_import,
+    'tunable': bench_tunable,
+    'manager': bench_manager,
+    'serializers': bench_serializers,
+    'selectable': bench_selectable,
+}
+
+
+def _run_module(name, quick):
+    return MODULES[name].run(quick=quick)
+
+
+def run(names=None, quick=False):
+    results = {}
+    for name in names or MODULES:
+        print("Running %s benchmarks ..." % (name,), file=sys.stderr)
+        results.update(isolated(_run_module, name, quick))
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'quick': quick,
+        'results': results,
+    }
+
+
+def compare(baseline, current, threshold=1.25):
+    regressions = []
+
+    for name, timing in sorted(current['results'].items()):
+        previous = baseline['results'].get(name)
+        if not previous:
+            continue
+
+        if 'median' in timing and 'median' in previous:
+            if timing['median'] > previous['median'] * threshold:
+                regressions.append(
+                    "%s: %.3g s -> %.3g s"
+                    % (name, previous['median'], timing['median'])
+                )
+        elif None not in (timing.get('exponent'), previous.get('exponent')):
+            if timing['exponent'] > previous['exponent'] + 0.5:
+                regressions.append(
+                    "%s: exponent %.2f -> %.2f"
+                    % (name, previous['exponent'], timing['exponent'])
+                )
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--quick', action='store_true')
+    parser.add_argument('--output', type=str, default=None)
+    parser.add_argument('--compare', type=str, default=None)
+    parser.add_argument('--threshold', type=float, default=1.25)
+    parser.add_argument(
+        'benchmarks', nargs='*', help='any of %s (default: all)' % (', '.join(MODULES),)
+    )
+    args = parser.parse_args()
+
+    unknown = sorted(set(args.benchmarks) - set(MODULES))
+    if unknown:
+        parser.error('unknown benchmarks: %s' % (', '.join(unknown),))
+
+    results = run(args.benchmarks, quick=args.quick)
+
+    if args.output:
+        with open(args.output, 'w+') as fp:
+            json.dump(results, fp, indent=4, sort_keys=True)
+    else:
+        json.dump(results, sys.stdout, indent=4, sort_keys=True)
+        print()
+
+    if args.compare:
+        with open(args.compare) as fp:
+            regressions = compare(json.load(fp), results, threshold=args.threshold)
+        for regression in regressions:
+            print("Regression: %s" % (regression,), file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Array values are mutable, values of array tunables must not share them
+with their default, the passed value or frozen snapshots.
+"""
+
+from array import array
+
+import pytest
+
+from tunable import Tunable, TunableManager, tunable_cached
+
+
+class ArrayKernel(Tunable):
+    default = array('d', [0.25, 0.5, 0.25])
+
+
+@pytest.fixture(autouse=True)
+def cleanup():
+    yield
+    TunableManager.unfreeze()
+    ArrayKernel.reset()
+
+
+def test_default_not_shared():
+    # used repeatedly, the specialised set is built as well
+    for _ in range(3):
+        ArrayKernel.reset()
+        assert ArrayKernel.value is not ArrayKernel.default
+
+        ArrayKernel.value[0] = 1.0
+        assert ArrayKernel.default == array('d', [0.25, 0.5, 0.25])
+
+
+def test_passed_value_not_shared():
+    value = array('d', [1.0, 2.0])
+
+    for _ in range(3):
+        ArrayKernel.set(value)
+        assert ArrayKernel.value is not value
+        assert ArrayKernel.value == value
+
+
+def test_frozen_not_affected():
+    ArrayKernel.reset()
+    frozen = TunableManager.freeze()
+
+    ArrayKernel.value[0] = 1.0
+    assert frozen.ArrayKernel == array('d', [0.25, 0.5, 0.25])
+
+
+def test_cached_function():
+    calls = []
+
+    @tunable_cached
+    def total():
+        calls.append(None)
+        return sum(ArrayKernel.value)
+
+    assert total() == 1.0
+    assert total() == 1.0
+    assert len(calls) == 1
+
+    ArrayKernel.set([1.0, 2.0])
+    assert total() == 3.0
+    assert len(calls) == 2
+
+    # back at the default, the first result is reused
+    ArrayKernel.reset()
+    assert total() == 1.0
+    assert len(calls) == 2
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Loading a compiled snapshot has to give the very values loading its source
+gives, as they are not validated again.
+"""
+
+import json
+import math
+import random
+import struct
+from array import array
+
+import pytest
+
+from tunable import Tunable, TunableManager
+from tunable.compiled import CompiledTunables
+from tunable.tunable import Interval
+
+
+class CompiledRatio(Tunable):
+    default = 0.5
+
+
+class CompiledBound(Tunable):
+    default = 0.0
+    range = Interval(0.0, 1 / 3)
+
+
+class CompiledWeights(Tunable):
+    default = array('d', [1.0])
+
+
+class CompiledCount(Tunable):
+    default = 1
+
+
+NAMES = ('CompiledRatio', 'CompiledBound', 'CompiledWeights', 'CompiledCount')
+
+
+def random_float(rng):
+    while True:
+        value = struct.unpack('<d', rng.getrandbits(64).to_bytes(8, 'little'))[0]
+        if not math.isnan(value) and not math.isinf(value):
+            return value
+
+
+@pytest.fixture(autouse=True)
+def cleanup():
+    yield
+    for name in NAMES:
+        TunableManager.lookup(name).reset()
+
+
+def values_after(load):
+    load()
+    return {name: TunableManager.lookup(name).value for name in NAMES}
+
+
+def check_round_trip(tmp_path, values):
+    source = str(tmp_path / 'source.json')
+    target = str(tmp_path / 'source.tunc')
+
+    with open(source, 'w') as fp:
+        json.dump(values, fp)
+
+    CompiledTunables.compile(source, target)
+
+    from_source = values_after(lambda: TunableManager.load_file(source))
+    from_snapshot = values_after(lambda: CompiledTunables.load(target))
+
+    assert from_snapshot == from_source
+    for name in ('CompiledRatio', 'CompiledBound'):
+        assert from_snapshot[name].hex() == from_source[name].hex()
+
+
+def test_round_trip(tmp_path):
+    check_round_trip(
+        tmp_path,
+        {
+            'CompiledRatio': 927184.3047864115,
+            'CompiledBound': 1 / 3,
+            'CompiledWeights': [1 / 3, -0.0, 5e-324],
+            'CompiledCount': 7,
+        },
+    )
+
+    assert CompiledBound.value in CompiledBound.range
+
+
+def test_negative_zero(tmp_path):
+    check_round_trip(tmp_path, {'CompiledRatio': -0.0})
+
+
+def test_random_round_trip(tmp_path):
+    rng = random.Random(0)
+
+    for _ in range(50):
+        check_round_trip(
+            tmp_path,
+            {
+                'CompiledRatio': random_float(rng),
+                'CompiledBound': rng.uniform(0.0, 1 / 3),
+                'CompiledWeights': [random_float(rng) for _ in range(5)],
+            },
+        )
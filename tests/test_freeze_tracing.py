@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+Freezing and tracing both hook into committing values, and have to work
+in any order of enabling and disabling them.
+"""
+
+import itertools
+
+import pytest
+
+from tunable import Selectable, Tunable, TunableError, TunableManager
+from tunable.tracing import TunableTracer
+
+
+class FrozenThreshold(Tunable):
+    default = 1.0
+
+
+class FrozenEngine(Selectable):
+    pass
+
+
+class FrozenFastEngine(FrozenEngine, FrozenEngine.Default):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def cleanup():
+    yield
+    TunableManager.unfreeze()
+    TunableTracer.disable()
+    FrozenThreshold.set(1.0)
+
+
+def enable_tracing():
+    TunableTracer.enable()
+
+
+def freeze():
+    TunableManager.freeze()
+
+
+def disable_tracing():
+    TunableTracer.disable()
+
+
+def unfreeze():
+    TunableManager.unfreeze()
+
+
+def is_frozen():
+    return TunableManager.frozen is not None
+
+
+def check_state():
+    # used repeatedly, the specialised set is built as well
+    for _ in range(3):
+        if is_frozen():
+            with pytest.raises(TunableError):
+                FrozenThreshold.set(2.0)
+            assert FrozenThreshold.value == 1.0
+        else:
+            FrozenThreshold.set(2.0)
+            assert FrozenThreshold.value == 2.0
+            FrozenThreshold.set(1.0)
+
+
+def test_enable_freeze_disable_unfreeze():
+    enable_tracing()
+    check_state()
+
+    freeze()
+    check_state()
+
+    disable_tracing()
+    check_state()
+
+    unfreeze()
+    check_state()
+
+
+@pytest.mark.parametrize(
+    'order',
+    list(itertools.permutations((enable_tracing, freeze, disable_tracing, unfreeze))),
+    ids=lambda order: '-'.join(step.__name__ for step in order),
+)
+def test_any_order(order):
+    for step in order:
+        step()
+        check_state()
+
+
+def test_traced_writes_while_frozen():
+    TunableTracer.enable()
+    FrozenThreshold.set(1.0)
+
+    TunableManager.freeze()
+    with pytest.raises(TunableError):
+        FrozenThreshold.set(2.0)
+    TunableManager.unfreeze()
+
+    FrozenThreshold.set(3.0)
+    assert FrozenThreshold.value == 3.0
+
+    writes = sum(
+        statistics['writes']
+        for region in TunableTracer.get_report()['regions'].values()
+        for name, statistics in region.items()
+        if name.endswith('FrozenThreshold')
+    )
+    assert writes >= 2
+
+
+def test_frozen_with_selectable():
+    # e.g. by loading a file, the choice is kept
+    FrozenEngine._selectable_shadow_tunable.reset()
+
+    hash_value = TunableManager.get_hash()
+    serialization = TunableManager.get_serialization('json')
+
+    frozen = TunableManager.freeze()
+
+    # reading the tunable of a Selectable is no change
+    assert TunableManager.get_hash() == hash_value == frozen.get_hash()
+    assert TunableManager.get_serialization('json') == serialization
+    assert TunableManager.get_serialization('conf')
+    assert frozen['FrozenEngine'] == 'FrozenFastEngine'
+
+    with pytest.raises(TunableError):
+        FrozenEngine._selectable_shadow_tunable.set('FrozenFastEngine')
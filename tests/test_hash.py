@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+get_hash() caches the hash, values committed while it is computed (e.g. by
+other threads) must not get lost.
+"""
+
+import threading
+
+import pytest
+
+from tunable import Tunable, TunableManager
+from tunable.tunable import TunableMeta
+from tunable.tunablemanager import DerSerializer
+
+
+class HashedCounter(Tunable):
+    default = 0
+
+
+@pytest.fixture(autouse=True)
+def cleanup():
+    yield
+    HashedCounter.set(0)
+
+
+def uncached_hash():
+    return TunableManager._uncached_hash(DerSerializer())
+
+
+def test_commit_while_hashing():
+    TunableManager.get_hash()
+    HashedCounter.set(1)
+
+    def commit_once(cls, value):
+        # committed after the old value has been read for the hash
+        if cls is HashedCounter and value == 1:
+            TunableMeta.remove_read_hook(commit_once)
+            HashedCounter.set(2)
+
+    TunableMeta.add_read_hook(commit_once)
+    try:
+        TunableManager.get_hash()
+    finally:
+        if commit_once in TunableMeta._read_hooks:
+            TunableMeta.remove_read_hook(commit_once)
+
+    assert HashedCounter.value == 2
+    assert TunableManager.get_hash() == uncached_hash()
+
+
+def test_concurrent_commits():
+    stop = threading.Event()
+
+    def commit():
+        value = 0
+        while not stop.is_set():
+            value += 1
+            HashedCounter.set(value)
+
+    thread = threading.Thread(target=commit)
+    thread.start()
+    try:
+        for _ in range(2000):
+            TunableManager.get_hash()
+    finally:
+        stop.set()
+        thread.join()
+
+    assert TunableManager.get_hash() == uncached_hash()
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+Resolving a Selectable and listing its defaults (e.g. for argparse) have
+to agree on the default choice.
+"""
+
+from tunable import Selectable, SelectableManager
+
+
+class VirtualRoot(Selectable):
+    pass
+
+
+class VirtualBase(VirtualRoot, VirtualRoot.Virtual):
+    pass
+
+
+class VirtualDefault(VirtualBase, VirtualRoot.Default):
+    pass
+
+
+class VirtualOther(VirtualBase):
+    pass
+
+
+class DerivedRoot(Selectable):
+    pass
+
+
+class DerivedDefault(DerivedRoot, DerivedRoot.Default):
+    pass
+
+
+class DerivedChoice(DerivedDefault):
+    pass
+
+
+def test_default_below_virtual():
+    assert SelectableManager.defaults()[VirtualRoot] == [VirtualDefault]
+    assert SelectableManager.resolve_selectable(VirtualRoot) is VirtualDefault
+    assert isinstance(VirtualRoot(), VirtualDefault)
+
+
+def test_subclass_of_default():
+    assert SelectableManager.defaults()[DerivedRoot] == [DerivedDefault]
+    assert SelectableManager.resolve_selectable(DerivedRoot) is DerivedDefault
+    assert type(DerivedRoot()) is DerivedDefault
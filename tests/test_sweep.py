@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Sweep points are identified by their hash, which has to tell apart points
+differing only in tunables not taking part in TunableManager.get_hash().
+"""
+
+from tunable import Tunable, TunableManager
+from tunable.sweep import SweepIndex, TunableSweep
+
+
+class SweepThreshold(Tunable):
+    default = 0.5
+
+
+class SweepWorkers(Tunable):
+    default = 1
+    hash = False
+
+
+def workers():
+    return SweepWorkers.value
+
+
+def run(sweep, index):
+    return sorted(
+        result for _, _, result in sweep.run(workers, processes=0, index=index)
+    )
+
+
+def test_unhashed_tunable(tmp_path):
+    index = str(tmp_path / 'index.jsonl')
+    sweep = TunableSweep().add('SweepWorkers', [1, 2, 4, 8])
+
+    assert len({sweep.get_hash(point) for point in sweep}) == 4
+    assert run(sweep, index) == [1, 2, 4, 8]
+
+    # all of them are completed
+    assert run(sweep, SweepIndex(index)) == []
+
+
+def test_hashed_tunable(tmp_path):
+    sweep = TunableSweep().add('SweepThreshold', [0.1, 0.2])
+
+    for point in sweep:
+        with TunableManager.override(point):
+            assert sweep.get_hash(point) == TunableManager.get_hash()
+
+    index = str(tmp_path / 'index.jsonl')
+    assert len(run(sweep, index)) == 2
+    assert run(sweep, index) == []
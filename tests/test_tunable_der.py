@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+The native DER codec has to produce byte-identical output to pyasn1
+(with the generated schema), which serves as reference implementation.
+"""
+
+import math
+import random
+from array import array
+
+import pytest
+
+from tunable.schema import ASN1_SCHEMA_VERSION, tunable_der
+from tunable.tunablemanager import PyAsn1DerSerializer
+
+pytest.importorskip('pyasn1')
+
+EDGE_VALUES = [
+    True,
+    False,
+    0,
+    -1,
+    127,
+    128,
+    -128,
+    -129,
+    255,
+    256,
+    2**63,
+    -(2**63) - 1,
+    2**200,
+    0.0,
+    -0.0,
+    1.0,
+    -1.5,
+    0.1,
+    1e300,
+    5e-324,
+    float('inf'),
+    float('-inf'),
+    '',
+    'x' * 127,
+    'x' * 128,
+    'ü' * 300,
+    b'',
+    b'\x00' * 128,
+    bytes(range(256)) * 300,
+    array('d', [0.0, -1.5, float('inf')]),
+    array('f', [1.5] * 64),
+    array('q', [-(2**63), 0, 2**63 - 1]),
+    array('b', range(-128, 128)),
+]
+
+
+def random_value(rng):
+    kind = rng.choice((bool, int, float, str, bytes, array))
+
+    if kind is bool:
+        return rng.random() < 0.5
+    if kind is int:
+        return rng.randint(-(2 ** rng.randint(0, 130)), 2 ** rng.randint(0, 130))
+    if kind is float:
+        return rng.choice(
+            (
+                rng.uniform(-1e6, 1e6),
+                math.ldexp(rng.random(), rng.randint(-1074, 1023)),
+                -math.ldexp(rng.random(), rng.randint(-1074, 1023)),
+                float(rng.randint(-1000, 1000)),
+            )
+        )
+    if kind is str:
+        return ''.join(
+            chr(rng.choice((rng.randint(32, 126), rng.randint(160, 0x2FFF))))
+            for _ in range(rng.choice((0, 1, 127, 128, rng.randint(0, 600))))
+        )
+    if kind is bytes:
+        return bytes(rng.getrandbits(8) for _ in range(rng.randint(0, 400)))
+
+    typecode = rng.choice('dq')
+    return array(
+        typecode,
+        [
+            rng.uniform(-1e9, 1e9) if typecode == 'd' else rng.randint(-1000, 1000)
+            for _ in range(rng.randint(0, 40))
+        ],
+    )
+
+
+def random_tunables(rng):
+    return [
+        ('T%d' % (index,), random_value(rng)) for index in range(rng.randint(0, 12))
+    ]
+
+
+def reference_encode(tunables):
+    """The whole TunablesList, encoded by pyasn1."""
+    from pyasn1.codec.der.encoder import encode as der_encode
+
+    from tunable.schema import tunable_schema as schema
+
+    reference = PyAsn1DerSerializer()
+
+    tunables_list = schema.TunablesList()
+    tunables_list['version'] = ASN1_SCHEMA_VERSION
+    sequence = tunables_list['tunables']
+
+    for index, (name, value) in enumerate(tunables):
+        type_name = reference.get_type_name(value)
+        if type_name in reference.array_types:
+            _, value = tunable_der.array_to_bytes(value)
+
+        sequence[index]['name'] = name
+        sequence[index]['value'][type_name] = value
+
+    return der_encode(tunables_list)
+
+
+def assert_equal_values(decoded, expected):
+    # arrays are widened to 'd' and 'q', and like with pyasn1, -0.0 is
+    # encoded (and decoded) as 0.0
+    if isinstance(expected, array):
+        assert list(decoded) == list(expected)
+    else:
+        assert type(decoded) is type(expected)
+        assert decoded == expected
+
+
+@pytest.mark.parametrize('value', EDGE_VALUES, ids=repr)
+def test_edge_values_match_pyasn1(value):
+    reference = PyAsn1DerSerializer()
+
+    assert tunable_der.encode_tunable('name', value) == reference.encode_tunable(
+        'name', value
+    )
+
+
+def test_random_tunables_match_pyasn1():
+    rng = random.Random(4)
+
+    for _ in range(500):
+        tunables = random_tunables(rng)
+
+        assert tunable_der.encode(ASN1_SCHEMA_VERSION, tunables) == (
+            reference_encode(tunables)
+        )
+
+
+def test_edge_values_list_match_pyasn1():
+    tunables = [('T%d' % (index,), value) for index, value in enumerate(EDGE_VALUES)]
+
+    assert tunable_der.encode(ASN1_SCHEMA_VERSION, tunables) == (
+        reference_encode(tunables)
+    )
+
+
+def test_decode_round_trip():
+    tunables = [('T%d' % (index,), value) for index, value in enumerate(EDGE_VALUES)]
+
+    version, decoded = tunable_der.decode(
+        tunable_der.encode(ASN1_SCHEMA_VERSION, tunables)
+    )
+
+    assert version == ASN1_SCHEMA_VERSION
+    assert [name for name, _ in decoded] == [name for name, _ in tunables]
+    for (_, value), (_, expected) in zip(decoded, tunables):
+        assert_equal_values(value, expected)
+
+
+def test_random_round_trip():
+    rng = random.Random(16)
+
+    for _ in range(300):
+        tunables = random_tunables(rng)
+
+        version, decoded = tunable_der.decode(
+            tunable_der.encode(ASN1_SCHEMA_VERSION, tunables)
+        )
+
+        assert version == ASN1_SCHEMA_VERSION
+        assert [name for name, _ in decoded] == [name for name, _ in tunables]
+
+        for (_, value), (_, expected) in zip(decoded, tunables):
+            if isinstance(expected, float):
+                # floats are converted to decimal REALs like pyasn1 does,
+                # which accumulates rounding errors for some values
+                assert value == pytest.approx(expected, rel=1e-14, abs=0.0)
+            else:
+                assert_equal_values(value, expected)
+
+
+def test_decode_rejects_truncated_data():
+    data = tunable_der.encode(ASN1_SCHEMA_VERSION, [('name', 'value')])
+
+    with pytest.raises(ValueError):
+        tunable_der.decode(data[:-1])
+
+
+def test_exact_floats_round_trip():
+    rng = random.Random(23)
+    floats = [value for value in EDGE_VALUES if type(value) is float] + [
+        random_value(rng) for _ in range(2000)
+    ]
+    tunables = [
+        ('T%d' % (index,), value)
+        for index, value in enumerate(floats)
+        if type(value) is float
+    ]
+
+    data = tunable_der.encode(ASN1_SCHEMA_VERSION, tunables, exact=True)
+    _, decoded = tunable_der.decode(data)
+
+    for (_, value), (_, expected) in zip(decoded, tunables):
+        assert value.hex() == expected.hex()
+
+    # the binary form is valid DER, which pyasn1 decodes alike, except
+    # for -0.0 (the special value of X.690:2008 pyasn1 does not know)
+    from pyasn1.codec.der.decoder import decode as der_decode
+
+    from tunable.schema import tunable_schema as schema
+
+    tunables = [(name, value) for name, value in tunables if value.hex() != '-0x0.0p+0']
+    data = tunable_der.encode(ASN1_SCHEMA_VERSION, tunables, exact=True)
+
+    reference, _ = der_decode(data, asn1Spec=schema.TunablesList())
+    for tunable, (_, expected) in zip(reference['tunables'], tunables):
+        assert float(tunable['value']['floatValue']) == expected
@@ -3,6 +3,8 @@
 documentation
 """
 
+from .cache import tunable_cached
+from .tunable import Interval
 from .tunableselectable import (
     ModuleHelper,
     Selectable,
@@ -16,6 +18,7 @@ from .tunableselectable import (
 __version__ = '0.0.1.dev8'
 
 __all__ = [
+    "Interval",
     "ModuleHelper",
     "Selectable",
     "SelectableManager",
@@ -23,4 +26,5 @@ __all__ = [
     "TunableError",
     "TunableManager",
     "TunableSelectable",
+    "tunable_cached",
 ]
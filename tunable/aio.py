@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Loading and saving tunables from asyncio code.
+
+Files are read (and deserialized) or written concurrently in an executor,
+never on the event loop. Loaded values are validated and applied at once on
+the loop thread, so coroutines either see all of them or none::
+
+    await TunableManager.aload(['defaults.yaml', 'site.yaml'])
+    await TunableManager.asave('current.json')
+
+Several files are merged like --tunables-load arguments, later ones taking
+precedence (see tunable.layers).
+"""
+
+import asyncio
+import os
+
+from .layers import TunableLayers
+from .tunable import TunableError
+from .tunablemanager import SERIALIZERS, TunableManager, _write_atomically
+
+
+def _paths(path_or_paths):
+    if isinstance(path_or_paths, (str, bytes, os.PathLike)):
+        return [os.fspath(path_or_paths)]
+    return [os.fspath(path) for path in path_or_paths]
+
+
+def _write(file_name, data, overwrite):
+    if not overwrite and os.path.exists(file_name):
+        raise TunableError('File "%s" already exists.' % (file_name,))
+
+    _write_atomically(file_name, data)
+
+
+class AsyncTunables(object):
+    @staticmethod
+    async def load(path_or_paths, reset=True, executor=None):
+        """
+        Read all files concurrently, then apply them transactionally, returns
+        {class: file} of the tunables set.
+        """
+        loop = asyncio.get_running_loop()
+
+        layers = TunableLayers(environ={})
+        layers.files = list(
+            await asyncio.gather(
+                *[
+                    loop.run_in_executor(executor, TunableLayers.read_file, file_name)
+                    for file_name in _paths(path_or_paths)
+                ]
+            )
+        )
+
+        # no awaiting from here on
+        return layers.resolve(reset=reset)
+
+    @staticmethod
+    async def save(path_or_paths, fmt=None, overwrite=True, executor=None):
+        """
+        Save the current tunables to all files concurrently, in the format fmt
+        or the one given by each file's extension. All files get the values
+        as of the call.
+        """
+        loop = asyncio.get_running_loop()
+
+        pending = []
+        for file_name in _paths(path_or_paths):
+            extension = fmt or os.path.splitext(file_name)[1][1:].lower()
+            if extension not in SERIALIZERS:
+                raise TunableError("Unsupported format %s." % (extension,))
+
+            pending.append((file_name, TunableManager.get_serialization(extension)))
+
+        await asyncio.gather(
+            *[
+                loop.run_in_executor(executor, _write, file_name, data, overwrite)
+                for file_name, data in pending
+            ]
+        )
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+argparse actions, these are only imported once a parser gets registered
+"""
+
+import argparse
+import os
+import sys
+
+from .compiled import CompiledTunables
+from .modulehelper import ModuleHelper
+from .selectable import SelectableManager, parse_class_name_with_kwargs
+from .tunablemanager import SERIALIZERS, ConfigSerializer, TunableManager
+
+
+class ShowTunablesAction(argparse._StoreTrueAction):
+    quit_after_call = True  # False
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        TunableManager.resolve_pending()
+
+        cs = ConfigSerializer()
+
+        cs.serialize(
+            sys.stdout,
+            TunableManager.get_semilong_dict(),
+            origins=TunableManager.origins,
+        )
+
+        if self.__class__.quit_after_call:
+            sys.exit(1)
+
+
+class LoadTunablesAction(argparse.Action):
+    # the file loaded last, the source of --tunables-compile
+    last_loaded = None
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        file_name = os.path.abspath(values)
+
+        ext = os.path.splitext(file_name)
+        ext = ext[1][1:].lower()
+
+        if ext not in SERIALIZERS and ext != CompiledTunables.extension:
+            raise RuntimeError("Unsupported format %s." % (ext,))
+
+        if TunableManager.pending_layers is not None:
+            TunableManager.pending_layers.add_file(file_name)
+        else:
+            TunableManager.load_file(file_name)
+
+        LoadTunablesAction.last_loaded = file_name
+
+
+class SaveTunablesAction(argparse.Action):
+    quit_after_call = True  # False
+    prompt_overwrite = True  # False
+
+    def finish(self):
+        if self.__class__.quit_after_call:
+            sys.exit(1)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        file_name = os.path.abspath(values)
+
+        ext = os.path.splitext(file_name)
+        ext = ext[1][1:].lower()
+
+        if os.path.exists(file_name):
+            if self.__class__.prompt_overwrite:
+                while True:
+                    print("File \"%s\" already exists. Overwrite? [y/n]" % (file_name,))
+                    result = input().lower()
+                    if result in ['y', 'n']:
+                        break
+
+                if result != 'y':
+                    return self.finish()
+            else:
+                return self.finish()
+
+        if ext not in SERIALIZERS:
+            raise RuntimeError("Unsupported format %s." % (ext,))
+
+        s = SERIALIZERS[ext]()
+
+        TunableManager.resolve_pending()
+
+        # TODO: call get_serialization()?
+
+        print("Saving tunables to \"%s\" ..." % (file_name,))
+
+        with open(file_name, 'wb+' if s.need_binary else 'w+') as fp:
+            s.serialize(
+                fp,
+                representation=TunableManager.get_representation(),
+                tunables=TunableManager.get_semilong_dict(),
+            )
+
+        self.finish()
+
+
+class CompileTunablesAction(argparse.Action):
+    quit_after_call = True  # False
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        source = LoadTunablesAction.last_loaded
+
+        if source is None:
+            raise RuntimeError("No tunables file loaded to compile.")
+
+        file_name = os.path.abspath(values)
+
+        print("Compiling tunables of \"%s\" to \"%s\" ..." % (source, file_name))
+
+        CompiledTunables.compile(source, file_name)
+
+        if self.__class__.quit_after_call:
+            sys.exit(1)
+
+
+class SetTunableAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        pieces = values.split('=')
+
+        k = pieces[0]
+        remainder = '='.join(pieces[1:])
+
+        if TunableManager.pending_layers is not None:
+            TunableManager.pending_layers.set(k, remainder)
+        else:
+            TunableManager.set(k, remainder)
+
+
+class SweepTunablesAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        from .sweep import TunableSweep
+
+        sweep = getattr(namespace, self.dest, None)
+        if not isinstance(sweep, TunableSweep):
+            sweep = TunableSweep()
+
+        sweep.add_from_string(values)
+
+        setattr(namespace, self.dest, sweep)
+
+
+class ImportAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        ModuleHelper.load_module(values)
+
+
+# noinspection PyClassHasNoInit
+class SelectableArgparseAction(argparse.Action):
+    mapping = {}
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        if option_string in self.__class__.mapping:
+            mapped_selectable = self.__class__.mapping[option_string]
+
+            class_name = SelectableManager.class2name(mapped_selectable)
+
+            if SelectableManager.is_multiple(mapped_selectable):
+                setattr(
+                    namespace,
+                    class_name,
+                    getattr(namespace, class_name, []) + [values],
+                )
+            else:
+                setattr(namespace, class_name, values)
+
+            values, the_kwargs = parse_class_name_with_kwargs(values)
+
+            if SelectableManager.is_multiple(mapped_selectable):
+                SelectableManager.add(mapped_selectable, values)
+            else:
+                SelectableManager.set(mapped_selectable, values)
+
+            if the_kwargs:
+                SelectableManager.set_default_parameters(
+                    SelectableManager.get_choice_for_string(mapped_selectable, values),
+                    the_kwargs,
+                )
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+Support for array-valued tunables.
+
+Array tunables are declared by an array.array default, its typecode
+determines how values are stored::
+
+    class Kernel(Tunable):
+        default = array('d', [0.25, 0.5, 0.25])
+
+Values are accepted as arrays, sequences, NumPy arrays or comma separated
+strings ('1,2,3'). Range checks run over the whole array at once (with
+NumPy, if available), test() is called once with the whole array.
+Values should be treated as immutable, as they are cached for hashing.
+"""
+
+from array import array
+
+FLOAT_TYPECODES = 'fd'
+# arrays are encoded as int64, unsigned 64 bit typecodes ('Q', as well as
+# 'L' on LP64 platforms) could hold values beyond
+INT_TYPECODES = ''.join(
+    typecode
+    for typecode in 'bBhHiIlLqQ'
+    if typecode.islower() or array(typecode).itemsize < 8
+)
+
+_numpy = []
+
+
+def get_numpy():
+    """NumPy, or None if not available. Only imported upon first use."""
+    if not _numpy:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy.append(numpy)
+    return _numpy[0]
+
+
+def parse_array(text, typecode):
+    text = text.strip().strip('[]()')
+    convert = float if typecode in FLOAT_TYPECODES else int
+
+    return array(
+        typecode, (convert(piece) for piece in text.split(',') if piece.strip())
+    )
+
+
+def to_array(value, typecode):
+    """Convert value to a new array of typecode, raises ValueError."""
+    if typecode not in FLOAT_TYPECODES and typecode not in INT_TYPECODES:
+        raise ValueError(
+            'Unsupported array typecode %r, supported are %s.'
+            % (typecode, FLOAT_TYPECODES + INT_TYPECODES)
+        )
+
+    try:
+        if isinstance(value, array):
+            if value.typecode == typecode:
+                # a copy, so that e.g. the default is not shared
+                return value[:]
+            return array(typecode, value)
+
+        if isinstance(value, str):
+            return parse_array(value, typecode)
+
+        if hasattr(value, '__array_interface__'):
+            numpy = get_numpy()
+            if numpy is not None:
+                # copies the buffer, without going through Python objects
+                return array(
+                    typecode,
+                    numpy.asarray(value)
+                    .astype(typecode, order='C', casting='same_kind')
+                    .tobytes(),
+                )
+
+        return array(typecode, value)
+    except (TypeError, OverflowError) as e:
+        raise ValueError(str(e))
+
+
+def array_in_range(value, range_):
+    """
+    Whether all elements are within range_. A range is treated inclusively
+    (stop included, like for scalars), for float arrays as plain interval.
+    An Interval is checked by the extreme values, any other container for
+    membership of every element.
+    """
+    if not len(value):
+        return True
+
+    numpy = get_numpy()
+    values = numpy.frombuffer(value, dtype=value.typecode) if numpy else value
+
+    from .tunable import Interval
+
+    if isinstance(range_, Interval):
+        lowest, highest = _extremes(values, numpy)
+        return lowest in range_ and highest in range_
+
+    if isinstance(range_, range):
+        return _array_in_range_object(value.typecode, values, range_, numpy)
+
+    if numpy:
+        return bool(numpy.isin(values, list(range_)).all())
+
+    return all(map(range_.__contains__, values))
+
+
+def _extremes(values, numpy):
+    if numpy:
+        return values.min(), values.max()
+    return min(values), max(values)
+
+
+def _array_in_range_object(typecode, values, range_, numpy):
+    lowest, highest = _extremes(values, numpy)
+    lower, upper = sorted((range_.start, range_.stop))
+
+    inside = lower <= lowest and highest <= upper
+
+    if not inside or typecode in FLOAT_TYPECODES or abs(range_.step) == 1:
+        return inside
+
+    if numpy:
+        return bool(((values - range_.start) % range_.step == 0).all())
+
+    step, start = range_.step, range_.start
+    return all((element - start) % step == 0 for element in values)
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+Memoization keyed on the tunables a function actually reads.
+
+While a cached function misses, all reads of Tunable.value within the
+current context are recorded. The cache key consists of the values of the
+tunables read so far and the arguments, hence changes of unrelated tunables
+do not invalidate results::
+
+    @tunable_cached(maxsize=64, ttl=600.0)
+    def analysis(data):
+        return data * Threshold.value
+"""
+
+import functools
+import time
+from _thread import allocate_lock
+from array import array
+from collections import OrderedDict, namedtuple
+from contextvars import ContextVar
+
+from .tunable import TunableMeta, TunableRegistry
+
+_reads = ContextVar('tunable_reads', default=None)
+
+CacheInfo = namedtuple(
+    'CacheInfo', ['hits', 'misses', 'expired', 'maxsize', 'currsize', 'dependencies']
+)
+
+
+def _key_value(value):
+    # arrays are not hashable
+    if isinstance(value, array):
+        return value.typecode, value.tobytes()
+    return value
+
+
+def _record(cls, value):
+    reads = _reads.get()
+    if reads is not None and cls in TunableRegistry.classes:
+        reads.add(cls)
+
+
+class ReadRecorder(object):
+    """
+    Context manager recording the tunables read within the current thread or
+    asyncio task. Reads within nested recorders are recorded by the outer
+    ones as well.
+    """
+
+    _lock = allocate_lock()
+    _active = 0
+
+    def __init__(self):
+        self.reads = set()
+        self._outer = None
+        self._token = None
+
+    def __enter__(self):
+        with ReadRecorder._lock:
+            if ReadRecorder._active == 0:
+                TunableMeta.add_read_hook(_record)
+            ReadRecorder._active += 1
+
+        self._outer = _reads.get()
+        self._token = _reads.set(self.reads)
+        return self.reads
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _reads.reset(self._token)
+
+        if self._outer is not None:
+            self._outer.update(self.reads)
+
+        with ReadRecorder._lock:
+            ReadRecorder._active -= 1
+            if ReadRecorder._active == 0:
+                TunableMeta.remove_read_hook(_record)
+
+
+class TunableCache(object):
+    """
+    LRU store of a function's results, bounded by maxsize entries (None for
+    unbounded) and optionally by ttl seconds per entry.
+    """
+
+    def __init__(self, function, maxsize=128, ttl=None):
+        self.function = function
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self.dependencies = ()
+        self.entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+        self._lock = allocate_lock()
+
+    def key(self, args, kwargs):
+        # reading the values also records them in recorders of callers
+        return (
+            self.dependencies,
+            tuple(_key_value(class_.value) for class_ in self.dependencies),
+            args,
+            tuple(sorted(kwargs.items())) if kwargs else (),
+        )
+
+    def __call__(self, *args, **kwargs):
+        key = self.key(args, kwargs)
+
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                expires, result = entry
+                if expires is None or expires > time.monotonic():
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return result
+
+                del self.entries[key]
+                self.expired += 1
+
+            self.misses += 1
+
+        with ReadRecorder() as reads:
+            result = self.function(*args, **kwargs)
+
+        with self._lock:
+            if not reads.issubset(self.dependencies):
+                # which tunables are read may depend on other tunables' values
+                self.dependencies = tuple(
+                    sorted(
+                        reads.union(self.dependencies),
+                        key=TunableRegistry.semilong_name,
+                    )
+                )
+
+        key = self.key(args, kwargs)
+
+        with self._lock:
+            self.entries[key] = (
+                None if self.ttl is None else time.monotonic() + self.ttl,
+                result,
+            )
+            self.entries.move_to_end(key)
+
+            if self.maxsize is not None:
+                while len(self.entries) > self.maxsize:
+                    self.entries.popitem(last=False)
+
+        return result
+
+    def info(self):
+        return CacheInfo(
+            self.hits,
+            self.misses,
+            self.expired,
+            self.maxsize,
+            len(self.entries),
+            tuple(TunableRegistry.semilong_name(c) for c in self.dependencies),
+        )
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.dependencies = ()
+            self.hits = self.misses = self.expired = 0
+
+
+def tunable_cached(function=None, maxsize=128, ttl=None):
+    """
+    Decorator caching results keyed on the arguments and the tunables read by
+    the function. Usable as @tunable_cached or @tunable_cached(maxsize, ttl).
+    The wrapper provides cache_info() and cache_clear().
+    """
+
+    def decorator(function):
+        cache = TunableCache(function, maxsize=maxsize, ttl=ttl)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            return cache(*args, **kwargs)
+
+        wrapper.cache = cache
+        wrapper.cache_info = cache.info
+        wrapper.cache_clear = cache.clear
+
+        return wrapper
+
+    if function is not None:
+        return decorator(function)
+
+    return decorator
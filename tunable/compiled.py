@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+"""
+Compiled snapshots of tunable files, for fast startup.
+
+A snapshot (.tunc) holds the converted and validated values of a source
+file, together with a fingerprint of the tunable definitions and the
+source's mtime, size and SHA-256::
+
+    > python example.py --tunables-load config.yaml --tunables-compile config.tunc
+    > python example.py --tunables-load config.tunc
+
+Loading sets all values without any parsing or validation, as long as the
+fingerprint matches and the source did not change. Otherwise the source
+file is loaded instead. The fingerprint does not cover globals which test()
+and the like refer to, after changing those, snapshots need recompiling.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import types
+from array import array
+from io import BytesIO, StringIO
+
+from .schema import ASN1_SCHEMA_VERSION, tunable_der
+from .tunable import TunableError, TunableRegistry
+from .tunablemanager import TunableManager, _write_atomically
+
+_MAGIC = b'TUNABLC1'
+_PREFIX_SIZE = len(_MAGIC) + 8
+
+
+def _stable_repr(value):
+    """repr of constants, independent of the process (e.g. of set order)."""
+    if isinstance(value, (set, frozenset)):
+        return '{%s}' % (', '.join(sorted(map(_stable_repr, value))),)
+    if isinstance(value, (tuple, list)):
+        return '(%s)' % (', '.join(map(_stable_repr, value)),)
+    if isinstance(value, dict):
+        return _stable_repr(sorted(map(_stable_repr, value.items())))
+    if value is None or value is Ellipsis:
+        return repr(value)
+    if isinstance(value, (bool, int, float, complex, str, bytes)):
+        return repr(value)
+    return '<%s.%s>' % (type(value).__module__, type(value).__qualname__)
+
+
+def _update_code(hasher, code):
+    hasher.update(code.co_code)
+    hasher.update(
+        _stable_repr(
+            (code.co_names, code.co_varnames, code.co_freevars, code.co_cellvars)
+        ).encode()
+    )
+
+    for constant in code.co_consts:
+        if isinstance(constant, types.CodeType):
+            _update_code(hasher, constant)
+        else:
+            hasher.update(_stable_repr(constant).encode())
+
+
+def _update_function(hasher, function):
+    function = getattr(function, '__func__', function)
+    code = getattr(function, '__code__', None)
+
+    if code is None:
+        hasher.update(_stable_repr(function).encode())
+        return
+
+    _update_code(hasher, code)
+
+    cells = []
+    for cell in function.__closure__ or ():
+        try:
+            cells.append(cell.cell_contents)
+        except ValueError:  # empty cell
+            cells.append(None)
+
+    hasher.update(
+        _stable_repr(
+            (function.__defaults__, function.__kwdefaults__ or {}, cells)
+        ).encode()
+    )
+
+
+def _definition(class_):
+    type_ = class_.type_
+    if type_ is None and class_.convert_type:
+        type_ = type(class_.default)
+
+    range_ = class_.range
+    if isinstance(range_, (set, frozenset)):
+        # the order of sets changes between processes
+        range_ = sorted(map(repr, range_))
+
+    return (
+        TunableRegistry.semilong_name(class_),
+        type_,
+        class_.typecode,
+        class_.convert_type,
+        range_,
+        class_.default,
+    )
+
+
+def registry_fingerprint():
+    """
+    Fingerprint of the definitions of all tunables, i.e. of everything
+    conversion and validation depend on: types, ranges, defaults and the
+    test, _convert and _check_range functions (their code, constants,
+    default arguments and closures).
+
+    Globals these functions refer to are not covered; as snapshots are
+    loaded without any validation, changing them requires recompiling.
+    """
+    definitions = []
+    # functions, numbered in order of appearance
+    functions = {}
+
+    for class_ in TunableRegistry.sorted_classes():
+        definitions.append(
+            _definition(class_)
+            + tuple(
+                functions.setdefault(
+                    getattr(function, '__func__', function), len(functions)
+                )
+                for function in (class_.test, class_._convert, class_._check_range)
+            )
+        )
+
+    hasher = hashlib.sha256(repr(definitions).encode())
+
+    for function in functions:
+        _update_function(hasher, function)
+
+    return 'SHA256:' + hasher.hexdigest()
+
+
+class CompiledTunables(object):
+    extension = 'tunc'
+
+    @classmethod
+    def compile(cls, source, target):
+        """
+        Compile the tunable file source into the snapshot target. Values are
+        validated like loading source would, the snapshot only holds the
+        values given by source.
+        """
+        source = os.path.abspath(source)
+        serializer = TunableManager.get_serializer(source)
+
+        with open(source, 'rb') as fp:
+            stat = os.fstat(fp.fileno())
+            data = fp.read()
+
+        values = serializer.deserialize(
+            BytesIO(data) if serializer.need_binary else StringIO(data.decode())
+        )
+
+        pending = TunableManager._validate_many(values, reset=True)
+        # only the values given, so that as a layer, the snapshot does not
+        # override earlier files with defaults
+        given = {TunableRegistry.lookup(key) for key in values}
+
+        try:
+            payload = tunable_der.encode(
+                ASN1_SCHEMA_VERSION,
+                sorted(
+                    (TunableRegistry.semilong_name(class_), value)
+                    for class_, (_, value) in pending.items()
+                    if class_ in given
+                ),
+                exact=True,
+            )
+        except TypeError as e:
+            raise TunableError('Tunables can not be compiled: %s' % (e,))
+
+        header = json.dumps(
+            dict(
+                fingerprint=registry_fingerprint(),
+                source=source,
+                mtime_ns=stat.st_mtime_ns,
+                size=stat.st_size,
+                sha256=hashlib.sha256(data).hexdigest(),
+            )
+        ).encode()
+
+        _write_atomically(
+            target,
+            _MAGIC + len(header).to_bytes(8, 'little') + header + payload,
+        )
+
+    @staticmethod
+    def _source_unchanged(header):
+        source = header['source']
+
+        try:
+            stat = os.stat(source)
+        except OSError:
+            return True  # e.g. deployed without its source
+
+        if stat.st_mtime_ns == header['mtime_ns'] and stat.st_size == header['size']:
+            return True
+
+        # touched, but possibly not modified
+        with open(source, 'rb') as fp:
+            return hashlib.sha256(fp.read()).hexdigest() == header['sha256']
+
+    @staticmethod
+    def _read_header(mapped, file_name):
+        """(header, offset of the payload)"""
+        if mapped[: len(_MAGIC)] != _MAGIC:
+            raise TunableError('Not a compiled tunables file: %s' % (file_name,))
+
+        length = int.from_bytes(mapped[len(_MAGIC) : _PREFIX_SIZE], 'little')
+
+        try:
+            header = json.loads(mapped[_PREFIX_SIZE : _PREFIX_SIZE + length].decode())
+            for key in ('fingerprint', 'source', 'mtime_ns', 'size', 'sha256'):
+                header[key]
+        except (ValueError, TypeError, KeyError) as e:
+            raise TunableError('Corrupt compiled tunables file %s: %s' % (file_name, e))
+
+        return header, _PREFIX_SIZE + length
+
+    @staticmethod
+    def _restore_arrays(values):
+        for index, (name, value) in enumerate(values):
+            if isinstance(value, array):
+                # arrays are stored as float64 or int64
+                class_ = TunableRegistry.lookup(name)
+                typecode = class_.typecode or class_.default.typecode
+                if value.typecode != typecode:
+                    values[index] = (name, array(typecode, value))
+
+    @classmethod
+    def read(cls, file_name):
+        """
+        The snapshot's values as list of (name, value), or None if the
+        snapshot is outdated, together with its header.
+        """
+        with open(file_name, 'rb') as fp:
+            try:
+                mapped = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                raise TunableError('Not a compiled tunables file: %s' % (file_name,))
+
+        with mapped:
+            header, offset = cls._read_header(mapped, file_name)
+
+            if header['fingerprint'] != registry_fingerprint():
+                return None, header
+
+            if not cls._source_unchanged(header):
+                return None, header
+
+            # a copy, so that nothing refers to the mapping once it is closed
+            payload = mapped[offset:]
+
+        try:
+            version, values = tunable_der.decode(payload)
+        except ValueError as e:
+            raise TunableError('Corrupt compiled tunables file %s: %s' % (file_name, e))
+
+        if version != ASN1_SCHEMA_VERSION:
+            return None, header
+
+        cls._restore_arrays(values)
+
+        return values, header
+
+    @classmethod
+    def load(cls, file_name, reset=True):
+        """
+        Load a snapshot, falling back to its source if it is outdated.
+        Returns the list of tunables set.
+        """
+        values, header = cls.read(file_name)
+
+        if values is None:
+            if not os.path.exists(header['source']):
+                raise TunableError(
+                    'Compiled tunables are outdated and their source is missing',
+                    file_name,
+                )
+            return TunableManager.load_file(header['source'], reset=reset)
+
+        return TunableManager.load_many(dict(values), reset=reset, validate=False)
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+Concurrent fan-out over the chosen implementations of a selectable.
+
+Calls a method on every chosen implementation (e.g. of a Selectable.Multiple
+root) concurrently, in a thread pool or, if the root sets
+fan_out_pool = 'process', in a process pool initialized with the current
+tunable and selectable state::
+
+    for result in SelectableManager.fan_out_stream(Detector, 'detect', image):
+        ...
+
+Errors (and timeouts) of one implementation do not affect the others,
+they are returned as part of its FanOutResult.
+"""
+
+import os
+import time
+from _thread import allocate_lock
+from collections import namedtuple
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    TimeoutError,
+    wait,
+)
+
+from .selectable import SelectableManager
+
+FanOutResult = namedtuple('FanOutResult', ['choice', 'result', 'error'])
+
+
+def _call(choice, method, args, kwargs):
+    instance = SelectableManager.instantiate_selectable(choice, (), {})
+    return getattr(instance, method)(*args, **kwargs)
+
+
+class SelectableFanOut(object):
+    pool_types = ('thread', 'process')
+
+    # thread pools are kept per root
+    _executors = {}
+    _lock = allocate_lock()
+
+    @classmethod
+    def get_choices(cls, selectable):
+        choices = SelectableManager.resolve_selectable(selectable)
+        if not isinstance(choices, list):
+            choices = [choices]
+        return choices
+
+    @classmethod
+    def _executor(cls, selectable, count):
+        """(executor, whether it needs to be shut down after use)"""
+        pool = selectable.fan_out_pool
+        if pool not in cls.pool_types:
+            raise ValueError('Unsupported fan-out pool "%s"' % (pool,))
+
+        workers = selectable.fan_out_workers
+
+        if pool == 'process':
+            from .tunableselectable import TunableSelectable
+
+            # a fresh pool, so that workers get the current state
+            return (
+                ProcessPoolExecutor(
+                    max_workers=min(workers or os.cpu_count() or 1, count),
+                    **TunableSelectable.get_pool_kwargs()
+                ),
+                True,
+            )
+
+        with cls._lock:
+            if selectable not in cls._executors:
+                cls._executors[selectable] = ThreadPoolExecutor(
+                    max_workers=workers,
+                    thread_name_prefix='fan-out-%s' % (selectable.__name__,),
+                )
+            return cls._executors[selectable], False
+
+    @classmethod
+    def stream(cls, selectable, method, args=(), kwargs=None, timeout=None):
+        """
+        Yield a FanOutResult per chosen implementation, in order of
+        completion. Implementations not finished within timeout seconds
+        (each, since it started running) are yielded with a TimeoutError.
+        """
+        return cls._stream(
+            selectable, cls.get_choices(selectable), method, args, kwargs, timeout
+        )
+
+    @classmethod
+    def _stream(cls, selectable, choices, method, args, kwargs, timeout):
+        executor, owned = cls._executor(selectable, len(choices))
+
+        try:
+            running = {
+                executor.submit(_call, choice, method, args, kwargs or {}): choice
+                for choice in choices
+            }
+            started = {}
+
+            while running:
+                cls._mark_started(running, started)
+
+                done, _ = wait(
+                    running,
+                    timeout=cls._wait_timeout(running, started, timeout),
+                    return_when=FIRST_COMPLETED,
+                )
+
+                for future in done:
+                    choice = running.pop(future)
+                    error = future.exception()
+                    yield FanOutResult(
+                        choice, None if error else future.result(), error
+                    )
+
+                if timeout is not None:
+                    yield from cls._expire(running, started, timeout)
+        finally:
+            if owned:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    # while implementations are queued, how often to check whether they started
+    poll_interval = 0.05
+
+    @staticmethod
+    def _mark_started(running, started):
+        now = time.monotonic()
+        for future in running:
+            if future not in started and (future.running() or future.done()):
+                started[future] = now
+
+    @classmethod
+    def _wait_timeout(cls, running, started, timeout):
+        if timeout is None:
+            return None
+
+        now = time.monotonic()
+        remaining = [
+            max(0, started[future] + timeout - now)
+            for future in running
+            if future in started
+        ]
+        if len(remaining) < len(running):
+            remaining.append(cls.poll_interval)
+
+        return min(remaining)
+
+    @staticmethod
+    def _expire(running, started, timeout):
+        now = time.monotonic()
+        expired = [
+            future
+            for future in running
+            if future in started
+            and now - started[future] >= timeout
+            and not future.done()
+        ]
+
+        for future in expired:
+            choice = running.pop(future)
+            future.cancel()
+            yield FanOutResult(choice, None, TimeoutError('%s timed out' % (choice,)))
+
+    @classmethod
+    def run(cls, selectable, method, args=(), kwargs=None, timeout=None):
+        """A FanOutResult per chosen implementation, in choice order."""
+        choices = cls.get_choices(selectable)
+        order = {choice: index for index, choice in enumerate(choices)}
+
+        return sorted(
+            cls._stream(selectable, choices, method, args, kwargs, timeout),
+            key=lambda result: order[result.choice],
+        )
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Layered configuration sources.
+
+Values are collected from several sources without any side effects, and
+resolved at once, with the precedence
+
+    defaults < files (in order) < environment < command line
+
+Every tunable is converted and validated exactly once, the layer each value
+came from is recorded in TunableManager.origins. Environment variables are
+named TUNABLE_<name>, with '__' standing for '.' in long names::
+
+    layers = TunableLayers()
+    layers.add_file('config.yaml')
+    layers.set('Threshold', '0.5')
+    layers.resolve()
+
+register_argparser collects --tunables-load and -t this way, and resolves
+them after parsing.
+"""
+
+import os
+
+from .tunable import TunableError, TunableRegistry
+from .tunablemanager import TunableManager
+
+ENVIRONMENT_LAYER = 'environment'
+COMMAND_LINE_LAYER = 'command line'
+
+
+class TunableLayers(object):
+    environment_prefix = 'TUNABLE_'
+
+    def __init__(self, environ=None):
+        # [(layer name, {key: value}, whether values are validated already)]
+        self.files = []
+        self.command_line = {}
+        # None: os.environ, as of resolving
+        self.environ = environ
+
+    @staticmethod
+    def read_file(file_name):
+        """
+        Read (but do not apply) a file, in any format load_file supports,
+        returns a layer (layer name, {key: value}, validated).
+        """
+        from .compiled import CompiledTunables
+
+        layer = 'file %s' % (file_name,)
+
+        if file_name.lower().endswith('.' + CompiledTunables.extension):
+            values, header = CompiledTunables.read(file_name)
+            if values is not None:
+                return layer, dict(values), True
+            file_name = header['source']
+
+        serializer = TunableManager.get_serializer(file_name)
+
+        with open(file_name, 'rb' if serializer.need_binary else 'r') as fp:
+            return layer, serializer.deserialize(fp), False
+
+    def add_file(self, file_name):
+        self.files.append(self.read_file(file_name))
+
+    def set(self, key, value):
+        self.command_line[key] = value
+
+    def get_environment(self):
+        """{name: value} of all environment variables naming a known tunable."""
+        environ = os.environ if self.environ is None else self.environ
+        prefix = self.environment_prefix
+        values = {}
+
+        for variable, value in environ.items():
+            if not variable.startswith(prefix):
+                continue
+
+            name = variable[len(prefix) :]
+            for key in (name, name.replace('__', '.')):
+                try:
+                    TunableRegistry.lookup(key)
+                except TunableError:
+                    continue
+                values[key] = value
+                break
+
+        return values
+
+    def get_layers(self):
+        """All layers, by increasing precedence."""
+        return self.files + [
+            (ENVIRONMENT_LAYER, self.get_environment(), False),
+            (COMMAND_LINE_LAYER, self.command_line, False),
+        ]
+
+    def resolve(self, reset=False):
+        """
+        Apply the winning value of every tunable given by any layer, at once
+        and transactionally, resetting all others if reset is set.
+        Returns {class: layer name}.
+        """
+        winners = {}
+
+        for layer, values, validated in self.get_layers():
+            for key, value in values.items():
+                try:
+                    target = TunableRegistry.lookup(key)
+                except TunableError:
+                    target = key  # reported by validation below
+                winners[target] = (layer, key, value, validated)
+
+        values = {
+            key: value
+            for _, (key, value) in TunableManager._validate_many(
+                {
+                    key: value
+                    for _, key, value, validated in winners.values()
+                    if not validated
+                }
+            ).items()
+        }
+        values.update(
+            (key, value) for _, key, value, validated in winners.values() if validated
+        )
+
+        if values or reset:  # nothing to set is fine while frozen
+            TunableManager.load_many(values, reset=reset, validate=False)
+
+        origins = {class_: layer for class_, (layer, _, _, _) in winners.items()}
+        TunableManager.origins.update(origins)
+
+        return origins
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Manifests of Selectable implementations, to avoid importing plugins.
+
+A manifest maps every Selectable root to its choices, as (name, module,
+default) entries, stored as JSON. It is generated once by importing the
+plugin modules (and regenerated whenever one of them changed)::
+
+    manifest = SelectableManifest.load_or_scan('plugins.json', ['plugins.md5'])
+    SelectableManager.use_manifest(manifest)
+
+Afterwards, argparse choices, validation and get_choice_for_string are
+answered from the manifest, only the module of a choice actually selected
+gets imported.
+"""
+
+import importlib
+import importlib.util
+import json
+import os
+
+from .selectable import SelectableRegistry
+
+
+class SelectableManifest(object):
+    def __init__(self, roots=None):
+        # root name -> [(choice name, module, default), ...]
+        self.roots = roots or {}
+        self._choices = {}
+
+    @staticmethod
+    def root_name(root):
+        return '%s:%s' % (root.__module__, root.__qualname__)
+
+    def get(self, root):
+        """{choice name: (module, default)} of root."""
+        name = self.root_name(root)
+
+        if name not in self._choices:
+            self._choices[name] = {
+                choice: (module, default)
+                for choice, module, default in self.roots.get(name, ())
+            }
+
+        return self._choices[name]
+
+    @classmethod
+    def scan(cls, modules=()):
+        """Import modules, and build a manifest of all known selectables."""
+        for module in modules:
+            importlib.import_module(module)
+
+        from .selectable import Selectable
+
+        return cls(
+            {
+                cls.root_name(root): [
+                    (
+                        choice.__name__,
+                        choice.__module__,
+                        issubclass(choice, Selectable.Default),
+                    )
+                    for choice in choices
+                ]
+                for root, choices in SelectableRegistry.choices.items()
+            }
+        )
+
+    @classmethod
+    def load(cls, file_name):
+        with open(file_name) as fp:
+            data = json.load(fp)
+
+        return cls(
+            {
+                root: [tuple(entry) for entry in entries]
+                for root, entries in data['roots'].items()
+            }
+        )
+
+    def save(self, file_name):
+        with open(file_name, 'w+') as fp:
+            json.dump(
+                dict(roots=self.roots), fp, indent=4, sort_keys=True, ensure_ascii=False
+            )
+
+    @staticmethod
+    def _source_time(module):
+        try:
+            spec = importlib.util.find_spec(module)
+        except (ImportError, ValueError):
+            spec = None
+
+        if spec is None or not spec.origin or not os.path.exists(spec.origin):
+            return None
+
+        return os.stat(spec.origin).st_mtime
+
+    @classmethod
+    def load_or_scan(cls, file_name, modules):
+        """
+        Load the manifest file_name, unless it is missing or older than any
+        of the modules, in which case they are scanned and it is rewritten.
+        """
+        if os.path.exists(file_name):
+            created = os.stat(file_name).st_mtime
+            times = [cls._source_time(module) for module in modules]
+
+            if all(time is not None and time <= created for time in times):
+                return cls.load(file_name)
+
+        manifest = cls.scan(modules)
+        manifest.save(file_name)
+        return manifest
@@ -3,11 +3,14 @@
 documentation
 """
 
-import argparse
 import importlib
+import importlib.util
+import os
 import sys
-import warnings
 from itertools import product
+from time import perf_counter
+
+from .tunable import classproperty
 
 
 class ModuleHelper(object):
@@ -22,19 +25,52 @@ class ModuleHelper(object):
 
     modules = {}
 
+    # module name -> whether it can be found (positive and negative cache)
+    found = {}
+    # requested module -> seconds spent loading it
+    import_times = {}
+
+    # whether load_modules imports several modules concurrently, only for
+    # modules known to be independent: the order in which they register
+    # tunables and selectables (and any other side effects) is not kept
+    parallel_imports = False
+
+    _path_prepared = False
+    # while pre-parsing, -m modules are collected here to be loaded at once
+    _deferred = None
+
     @classmethod
     def add_prefix(cls, prefix):
         cls.prefixes.append(prefix)
 
     @classmethod
-    def load_module(cls, module_str):
-        if module_str in cls.modules:
-            return
+    def _prepare_path(cls):
+        if not cls._path_prepared:
+            sys.path.insert(0, '.')
+            cls._path_prepared = True
 
-        sys.path.insert(0, '.')
+    @classmethod
+    def find_module(cls, name):
+        """Whether module name can be imported, without importing it."""
+        if name not in cls.found:
+            if name in sys.modules:
+                cls.found[name] = True
+            else:
+                try:
+                    cls.found[name] = importlib.util.find_spec(name) is not None
+                except (ImportError, ValueError):
+                    cls.found[name] = False
 
-        module_ = None
+        return cls.found[name]
 
+    @classmethod
+    def clear_cache(cls):
+        """Forget which modules were (not) found, e.g. after installing some."""
+        cls.found.clear()
+        importlib.invalidate_caches()
+
+    @classmethod
+    def get_candidates(cls, module_str):
         names = [
             "%s%s"
             % (
@@ -45,14 +81,64 @@ class ModuleHelper(object):
                 [module_str, module_str.lower()], reversed(cls.prefixes)
             )
         ]
+        return list(dict.fromkeys(names))
+
+    @classmethod
+    def load_modules(cls, module_strs):
+        """
+        Load several modules in order, or concurrently in a thread pool if
+        parallel_imports is set. Failures are raised (or warned about) as
+        by load_module.
+        """
+        pending = [m for m in dict.fromkeys(module_strs) if m not in cls.modules]
+
+        if len(pending) > 1 and cls.parallel_imports:
+            # imported here, so that importing tunable stays cheap
+            from concurrent.futures import ThreadPoolExecutor
+
+            cls._prepare_path()
+
+            # imports largely wait for I/O, more threads than cores help
+            with ThreadPoolExecutor(
+                max_workers=min(len(pending), (os.cpu_count() or 1) + 4)
+            ) as executor:
+                futures = [executor.submit(cls.load_module, m) for m in pending]
+
+            # failed ones are retried in order below, to report their errors
+            for future in futures:
+                future.exception()
+
+        for module_str in pending:
+            cls.load_module(module_str)
+
+    @classmethod
+    def load_module(cls, module_str):
+        if module_str in cls.modules:
+            return
+
+        if cls._deferred is not None:
+            cls._deferred.append(module_str)
+            return
+
+        cls._prepare_path()
+
+        module_ = None
+
+        names = cls.get_candidates(module_str)
+
+        start = perf_counter()
 
         for name in names:
+            if not cls.find_module(name):
+                continue
             try:
                 module_ = importlib.import_module(name)
                 break
             except ImportError:
                 pass
 
+        cls.import_times[module_str] = perf_counter() - start
+
         if module_ is None:
             error_msg = (
                 "Attempted to load any of %r, but could not load any module." % (names,)
@@ -60,15 +146,19 @@ class ModuleHelper(object):
             if cls.error_mode == Exception:
                 raise ImportError(error_msg)
             elif cls.error_mode == Warning:
+                import warnings
+
                 warnings.warn(error_msg, ImportWarning)
             else:
                 raise RuntimeError('Invalid error mode.')
 
         cls.modules[module_str] = module_
 
-    class ImportAction(argparse.Action):
-        def __call__(self, parser, namespace, values, option_string=None):
-            ModuleHelper.load_module(values)
+    @classproperty
+    def ImportAction(cls):
+        from .argparseactions import ImportAction
+
+        return ImportAction
 
     @classmethod
     def register_and_preparse(cls, parser, args=None, short='m', long='module'):
@@ -85,7 +175,15 @@ class ModuleHelper(object):
             type=str,
             action=cls.ImportAction,
         )
-        parser.parse_known_args(args=args)
+
+        cls._deferred = []
+        try:
+            parser.parse_known_args(args=args)
+            deferred = cls._deferred
+        finally:
+            cls._deferred = None
+
+        cls.load_modules(deferred)
 
         for action in actions:
             parser._actions.insert(0, action)
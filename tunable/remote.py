@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""
+Distribution of tunables over HTTP.
+
+A TunableServer serves the current tunables of its process, in any of the
+SERIALIZERS formats, as /tunables.<format>. Every response carries
+TunableManager.get_hash() as ETag. Clients send the hash of their own
+tunables as If-None-Match: if it matches, the server answers 304 Not
+Modified; if it is the hash of an earlier profile of the server, only the
+tunables changed since are sent; otherwise the whole profile::
+
+    server = TunableManager.serve(('0.0.0.0', 8080))  # central process
+
+    poller = TunableManager.poll('http://central:8080/tunables.json')  # workers
+
+The poller applies the received values transactionally, like TunableWatcher.
+Tunables not taking part in get_hash() (hash = False) are distributed along,
+but their changes alone are not noticed.
+"""
+
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO, StringIO
+from time import perf_counter
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from .tunablemanager import SERIALIZERS, TunableManager
+from .watch import PeriodicReloader
+
+CONTENT_TYPES = {
+    'json': 'application/json',
+    'yaml': 'application/yaml',
+    'conf': 'text/plain; charset=utf-8',
+    'der': 'application/octet-stream',
+    'xml': 'application/xml',
+}
+
+# set on responses only containing the changes since the given ETag
+BASE_HEADER = 'X-Tunables-Base'
+
+
+def quote_etag(hash_value):
+    return '"%s"' % (hash_value,)
+
+
+def parse_etags(header):
+    """The hashes listed in an If-None-Match header."""
+    result = []
+    for tag in (header or '').split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag:
+            result.append(tag.strip('"'))
+    return result
+
+
+class TunableServer(object):
+    """
+    Serves the tunables of the current process at address (by default, an
+    unused port on localhost, e.g. as stand-in within tests). The last
+    history profiles are kept to answer with differences.
+    """
+
+    path_prefix = '/tunables.'
+
+    def __init__(self, address=('127.0.0.1', 0), history=16):
+        self.history = history
+        # hash -> {semilong name: value}, least recently used first
+        self.profiles = OrderedDict()
+        # (base hash, hash, format) -> response body
+        self.bodies = {}
+        self.requests = 0
+        self.not_modified = 0
+
+        self._lock = threading.Lock()
+        self._thread = None
+
+        self.httpd = ThreadingHTTPServer(address, self._handler_class())
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return 'http://%s:%d' % (host, port)
+
+    def get_url(self, fmt='json'):
+        return self.url + self.path_prefix + fmt
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def _profile(self):
+        """(hash, values) of the current tunables."""
+        hash_value = TunableManager.get_hash()
+
+        profiles = self.profiles
+        if hash_value in profiles:
+            profiles.move_to_end(hash_value)
+        else:
+            profiles[hash_value] = TunableManager.get_representation()
+            while len(profiles) > self.history:
+                stale, _ = profiles.popitem(last=False)
+                for key in [key for key in self.bodies if stale in key[:2]]:
+                    del self.bodies[key]
+
+        return hash_value, profiles[hash_value]
+
+    def _body(self, fmt, base, hash_value, values):
+        key = (base, hash_value, fmt)
+
+        if key not in self.bodies:
+            if base is not None:
+                previous = self.profiles[base]
+                names = {
+                    name
+                    for name, value in values.items()
+                    if name not in previous or previous[name] != value
+                }
+            else:
+                names = set(values)
+
+            serializer = SERIALIZERS[fmt]()
+            buf = BytesIO() if serializer.need_binary else StringIO()
+
+            serializer.serialize(
+                buf,
+                tunables={
+                    name: class_
+                    for name, class_ in TunableManager.get_semilong_dict().items()
+                    if name in names
+                },
+                representation={name: values[name] for name in names},
+            )
+
+            body = buf.getvalue()
+            self.bodies[key] = body if serializer.need_binary else body.encode()
+
+        return self.bodies[key]
+
+    def respond(self, path, if_none_match=None):
+        """(status, headers, body) for a request."""
+        fmt = path.split('?')[0][len(self.path_prefix) :]
+
+        if not path.startswith(self.path_prefix) or fmt not in SERIALIZERS:
+            return 404, {}, b''
+
+        known = parse_etags(if_none_match)
+
+        with self._lock:
+            self.requests += 1
+            hash_value, values = self._profile()
+
+            headers = {'ETag': quote_etag(hash_value)}
+
+            if hash_value in known:
+                self.not_modified += 1
+                return 304, headers, b''
+
+            base = next((tag for tag in known if tag in self.profiles), None)
+            if base is not None:
+                headers[BASE_HEADER] = quote_etag(base)
+
+            body = self._body(fmt, base, hash_value, values)
+
+        headers['Content-Type'] = CONTENT_TYPES.get(fmt, 'application/octet-stream')
+        return 200, headers, body
+
+    def handle(self, request):
+        status, headers, body = self.respond(
+            request.path, request.headers.get('If-None-Match')
+        )
+
+        request.send_response(status)
+        for name, value in headers.items():
+            request.send_header(name, value)
+        request.send_header('Content-Length', str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self.httpd.serve_forever, name='TunableServer', daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+class TunablePoller(PeriodicReloader):
+    """
+    Polls url (as served by a TunableServer, its extension giving the
+    format) every interval seconds, and applies changes. callback(report)
+    is called with a ReloadReport after every poll which received values.
+
+    Along with its own hash, the ETag received last is sent, so tunables
+    changed locally are kept as long as the served profile does not change.
+    """
+
+    def __init__(self, url, interval=10.0, callback=None, timeout=10.0):
+        super().__init__(url, interval, callback)
+        self.timeout = timeout
+
+        fmt = url.split('?')[0].rpartition('.')[2].lower()
+        self.serializer = SERIALIZERS[fmt]()
+
+        # the ETag received last
+        self.etag = None
+        self.not_modified = 0
+
+    def _fetch(self):
+        """(headers, body), or None if not modified."""
+        tags = [TunableManager.get_hash()]
+        if self.etag is not None and self.etag not in tags:
+            tags.append(self.etag)
+
+        request = Request(
+            self.path,
+            headers={'If-None-Match': ', '.join(quote_etag(tag) for tag in tags)},
+        )
+
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                return response.headers, response.read()
+        except HTTPError as e:
+            if e.code == 304:
+                return None
+            raise
+
+    def check(self):
+        """Poll once, returns a ReloadReport or None if nothing changed."""
+        start = perf_counter()
+        changed, error = [], None
+
+        try:
+            response = self._fetch()
+            if response is None:
+                self.not_modified += 1
+                return None
+
+            headers, body = response
+
+            if self.serializer.need_binary:
+                values = self.serializer.deserialize(BytesIO(body))
+            else:
+                values = self.serializer.deserialize(StringIO(body.decode()))
+
+            changed = TunableManager.apply(values or {})
+            self.etag = parse_etags(headers.get('ETag'))[0]
+        except Exception as e:  # unreachable server, invalid values, ...
+            error = e
+
+        return self._report(start, changed, error)
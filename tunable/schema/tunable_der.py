@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+"""
+Native DER encoder/decoder for the tunable schema (see tunable_schema.asn).
+
+The output is byte-identical to encoding the corresponding pyasn1 objects
+(tunable_schema.py) with pyasn1's DER encoder, including the character
+(NR3) form pyasn1 uses to encode Python floats as REAL. That form does not
+round-trip all floats, encode(..., exact=True) uses the binary (base 2) form
+instead, e.g. for compiled snapshots.
+"""
+
+import math
+import sys
+from array import array
+
+TAG_BOOLEAN = 0x01
+TAG_INTEGER = 0x02
+TAG_OCTET_STRING = 0x04
+TAG_REAL = 0x09
+TAG_UTF8_STRING = 0x0C
+TAG_SEQUENCE = 0x30
+# [0] and [1] IMPLICIT OCTET STRING, big-endian float64 and int64 elements
+TAG_FLOAT_ARRAY = 0x80
+TAG_INT_ARRAY = 0x81
+
+_FLOAT_TYPECODES = 'fd'
+
+_BASE_BITS = (1, 3, 4)  # base 2, 8, 16
+
+_PLUS_INFINITY = float('inf')
+_MINUS_INFINITY = float('-inf')
+
+
+def encode_header(tag, length):
+    if length < 0x80:
+        return bytes((tag, length))
+
+    octets = length.to_bytes((length.bit_length() + 7) // 8, 'big')
+    return bytes((tag, 0x80 | len(octets))) + octets
+
+
+def _encode_primitive(tag, content):
+    return encode_header(tag, len(content)) + content
+
+
+def encode_bool(value):
+    return b'\x01\x01\xff' if value else b'\x01\x01\x00'
+
+
+def encode_int(value):
+    # like pyasn1, negative values with a multiple of 8 bits get
+    # an additional 0xff octet (e.g. -128 is encoded as ff 80)
+    return _encode_primitive(
+        TAG_INTEGER, value.to_bytes(value.bit_length() // 8 + 1, 'big', signed=True)
+    )
+
+
+def encode_float(value):
+    if value == _PLUS_INFINITY:
+        return b'\x09\x01\x40'
+
+    if value == _MINUS_INFINITY:
+        return b'\x09\x01\x41'
+
+    if value != value:
+        raise ValueError('NaN can not be encoded.')
+
+    # mirrors pyasn1's conversion of floats to (mantissa, 10, exponent)
+    exponent = 0
+    while int(value) != value:
+        value *= 10
+        exponent -= 1
+
+    mantissa = int(value)
+
+    if not mantissa:
+        return b'\x09\x00'
+
+    while mantissa % 10 == 0:
+        mantissa //= 10
+        exponent += 1
+
+    return _encode_primitive(
+        TAG_REAL,
+        b'\x03%dE%s%d' % (mantissa, b'+' if exponent == 0 else b'', exponent),
+    )
+
+
+def encode_float_exact(value):
+    """REAL in the binary base 2 form, which holds every float exactly."""
+    if value == 0.0 and math.copysign(1.0, value) < 0:
+        return b'\x09\x01\x43'
+
+    if value == 0.0 or math.isinf(value) or math.isnan(value):
+        return encode_float(value)
+
+    fraction, exponent = math.frexp(abs(value))
+    mantissa = int(fraction * 2**53)
+    exponent -= 53
+
+    # DER requires an odd mantissa
+    while not mantissa & 1:
+        mantissa >>= 1
+        exponent += 1
+
+    exponent_length = (exponent if exponent >= 0 else ~exponent).bit_length() // 8 + 1
+
+    return _encode_primitive(
+        TAG_REAL,
+        bytes((0x80 | (0x40 if value < 0 else 0) | (exponent_length - 1),))
+        + exponent.to_bytes(exponent_length, 'big', signed=True)
+        + mantissa.to_bytes((mantissa.bit_length() + 7) // 8, 'big'),
+    )
+
+
+def encode_str(value):
+    return _encode_primitive(TAG_UTF8_STRING, value.encode('utf-8'))
+
+
+def encode_bytes(value):
+    return _encode_primitive(TAG_OCTET_STRING, bytes(value))
+
+
+def array_to_bytes(value):
+    """
+    Big-endian float64 or int64 content of an array, returns (is_float, bytes).
+    Arrays of typecode 'd' or 'q' are copied through the buffer protocol,
+    others are converted element by element.
+    """
+    is_float = value.typecode in _FLOAT_TYPECODES
+    typecode = 'd' if is_float else 'q'
+
+    if value.typecode != typecode:
+        value = array(typecode, value)
+    elif sys.byteorder == 'little':
+        value = array(typecode, value.tobytes())
+
+    if sys.byteorder == 'little':
+        value.byteswap()
+
+    return is_float, value.tobytes()
+
+
+def bytes_to_array(data, is_float):
+    if len(data) % 8:
+        raise ValueError('Invalid array length %d.' % (len(data),))
+
+    value = array('d' if is_float else 'q', bytes(data))
+
+    if sys.byteorder == 'little':
+        value.byteswap()
+
+    return value
+
+
+def encode_array(value):
+    is_float, data = array_to_bytes(value)
+    return _encode_primitive(TAG_FLOAT_ARRAY if is_float else TAG_INT_ARRAY, data)
+
+
+ENCODERS = {
+    bool: encode_bool,
+    int: encode_int,
+    float: encode_float,
+    str: encode_str,
+    bytes: encode_bytes,
+    array: encode_array,
+}
+
+EXACT_ENCODERS = dict(ENCODERS)
+EXACT_ENCODERS[float] = encode_float_exact
+
+
+def encode_value(value, encoders=ENCODERS):
+    try:
+        encoder = encoders[type(value)]
+    except KeyError:
+        raise TypeError('Unsupported type %r.' % (type(value),))
+
+    return encoder(value)
+
+
+def encode_tunable(name, value, encoders=ENCODERS):
+    content = encode_str(name) + encode_value(value, encoders)
+    return encode_header(TAG_SEQUENCE, len(content)) + content
+
+
+def encode_pieces(version, fragments):
+    """
+    Return a DER encoded TunablesList as list of byte strings,
+    built around the already encoded Tunable fragments (in order).
+    """
+    sequence_of_length = sum(len(fragment) for fragment in fragments)
+    sequence_of_header = encode_header(TAG_SEQUENCE, sequence_of_length)
+    version = encode_int(version)
+
+    return [
+        encode_header(
+            TAG_SEQUENCE, len(version) + len(sequence_of_header) + sequence_of_length
+        ),
+        version,
+        sequence_of_header,
+    ] + list(fragments)
+
+
+def encode(version, tunables, exact=False):
+    """Encode a TunablesList, floats in the binary form if exact is set."""
+    encoders = EXACT_ENCODERS if exact else ENCODERS
+
+    return b''.join(
+        encode_pieces(
+            version,
+            [encode_tunable(name, value, encoders) for name, value in tunables],
+        )
+    )
+
+
+def decode_header(data, offset):
+    if offset + 2 > len(data):
+        raise ValueError('Truncated data at offset %d.' % (offset,))
+
+    tag, length = data[offset], data[offset + 1]
+    offset += 2
+
+    if length & 0x80:
+        count = length & 0x7F
+        if count == 0 or offset + count > len(data):
+            raise ValueError('Invalid length at offset %d.' % (offset,))
+        length = int.from_bytes(data[offset : offset + count], 'big')
+        offset += count
+
+    if offset + length > len(data):
+        raise ValueError('Truncated data at offset %d.' % (offset,))
+
+    return tag, offset, offset + length
+
+
+def decode_real(content):
+    if not content:
+        return 0.0
+
+    first = content[0]
+
+    if first & 0x80:
+        # binary encoding
+        base = (first >> 4) & 0x03
+        scale = (first >> 2) & 0x03
+        exponent_length = (first & 0x03) + 1
+        position = 1
+
+        if exponent_length == 4:
+            exponent_length = content[1]
+            position = 2
+
+        exponent = int.from_bytes(
+            content[position : position + exponent_length], 'big', signed=True
+        )
+        mantissa = int.from_bytes(content[position + exponent_length :], 'big')
+
+        if first & 0x40:
+            mantissa = -mantissa
+
+        return math.ldexp(mantissa << scale, exponent * _BASE_BITS[base])
+
+    if first == 0x40:
+        return _PLUS_INFINITY
+
+    if first == 0x41:
+        return _MINUS_INFINITY
+
+    if first == 0x43:
+        return -0.0
+
+    if first & 0xC0 == 0:
+        # decimal encoding (NR1, NR2 or NR3)
+        return float(bytes(content[1:]).decode('ascii').replace(',', '.'))
+
+    raise ValueError('Unsupported REAL encoding %r.' % (bytes(content),))
+
+
+def decode_value(data, offset):
+    tag, start, end = decode_header(data, offset)
+    content = data[start:end]
+
+    if tag == TAG_BOOLEAN:
+        value = content != b'\x00'
+    elif tag == TAG_INTEGER:
+        value = int.from_bytes(content, 'big', signed=True)
+    elif tag == TAG_REAL:
+        value = decode_real(content)
+    elif tag == TAG_UTF8_STRING:
+        value = bytes(content).decode('utf-8')
+    elif tag == TAG_OCTET_STRING:
+        value = bytes(content)
+    elif tag == TAG_FLOAT_ARRAY or tag == TAG_INT_ARRAY:
+        value = bytes_to_array(content, tag == TAG_FLOAT_ARRAY)
+    else:
+        raise ValueError('Unsupported tag 0x%02x at offset %d.' % (tag, offset))
+
+    return value, end
+
+
+def _expect(data, offset, expected_tag):
+    tag, start, end = decode_header(data, offset)
+    if tag != expected_tag:
+        raise ValueError(
+            'Expected tag 0x%02x at offset %d, got 0x%02x.'
+            % (expected_tag, offset, tag)
+        )
+    return start, end
+
+
+def decode(data):
+    """Decode a TunablesList, returns the version and a list of (name, value)."""
+    data = memoryview(data)
+
+    start, end = _expect(data, 0, TAG_SEQUENCE)
+
+    version_start, offset = _expect(data, start, TAG_INTEGER)
+    version = int.from_bytes(data[version_start:offset], 'big', signed=True)
+
+    offset, list_end = _expect(data, offset, TAG_SEQUENCE)
+
+    tunables = []
+
+    while offset < list_end:
+        offset, tunable_end = _expect(data, offset, TAG_SEQUENCE)
+
+        name, offset = decode_value(data, offset)
+        if not isinstance(name, str):
+            raise ValueError('Tunable name must be a UTF8String.')
+
+        value, offset = decode_value(data, offset)
+
+        if offset != tunable_end:
+            raise ValueError('Trailing data in Tunable at offset %d.' % (offset,))
+
+        tunables.append((name, value))
+
+    return version, tunables
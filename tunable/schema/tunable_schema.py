@@ -1,7 +1,7 @@
 # Auto-generated by asn1ate on 2017-05-22 14:59:14.572726
-from pyasn1.type import char, namedtype, univ
+from pyasn1.type import char, namedtype, tag, univ
 
-# constraint, namedval, tag, useful
+# constraint, namedval, useful
 
 
 class TunableType(univ.Choice):
@@ -14,6 +14,18 @@ TunableType.componentType = namedtype.NamedTypes(
     namedtype.NamedType('floatValue', univ.Real()),
     namedtype.NamedType('stringValue', char.UTF8String()),
     namedtype.NamedType('bytesValue', univ.OctetString()),
+    namedtype.NamedType(
+        'floatArrayValue',
+        univ.OctetString().subtype(
+            implicitTag=tag.Tag(tag.tagClassContext, tag.tagFormatSimple, 0)
+        ),
+    ),
+    namedtype.NamedType(
+        'intArrayValue',
+        univ.OctetString().subtype(
+            implicitTag=tag.Tag(tag.tagClassContext, tag.tagFormatSimple, 1)
+        ),
+    ),
 )
 
 
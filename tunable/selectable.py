@@ -3,13 +3,19 @@
 documentation
 """
 
+import importlib
+from _thread import allocate_lock
+from collections import OrderedDict
+
 from .modulehelper import ModuleHelper
+from .tunable import TunableError, classproperty
 
 
 class SelectableWatcher(type):
     def __init__(cls, name, bases, clsdict):
         super(SelectableWatcher, cls).__init__(name, bases, clsdict)
         try:
+            SelectableRegistry.add(cls)
             SelectableManager.register_selectable_as_tunable(cls)
         except NameError:
             pass
@@ -20,6 +26,11 @@ class SelectableWatcher(type):
 class Selectable(object, metaclass=SelectableWatcher):
     autoload = True
 
+    # how SelectableManager.fan_out runs the chosen implementations,
+    # 'thread' or 'process', and with how many workers (None: default)
+    fan_out_pool = 'thread'
+    fan_out_workers = None
+
     class SelectableChoice(object):
         overrides = {}
         parameters = {}
@@ -33,6 +44,10 @@ class Selectable(object, metaclass=SelectableWatcher):
     class Multiple(object):
         pass
 
+    # instances are reused per choice and arguments, see SelectableManager
+    class Shared(object):
+        pass
+
     @classmethod
     def SelectableGetMultiple(cls, *args, **kwargs):
         return SelectableManager.create_selectable(cls, args, kwargs, multiple=True)
@@ -41,6 +56,57 @@ class Selectable(object, metaclass=SelectableWatcher):
         return SelectableManager.create_selectable(cls, args, kwargs)
 
 
+class SelectableRegistry(object):
+    """
+    Incrementally maintained index of all Selectable roots (direct subclasses
+    of Selectable) and their choices (all non-virtual subclasses), updated
+    by SelectableWatcher upon class definition.
+    """
+
+    # root -> [choice, ...], in order of definition
+    choices = {}
+    # root -> {name: choice}
+    names = {}
+    # root -> [choice, ...] of choices marked as Default, the only source
+    # of defaults for resolving as well as listing them
+    defaults = {}
+
+    @classmethod
+    def add(cls, class_):
+        if Selectable in class_.__bases__:
+            cls.choices[class_] = []
+            cls.names[class_] = {}
+            cls.defaults[class_] = []
+
+        if Selectable.Virtual in class_.__bases__:
+            return
+
+        name = class_.__name__
+
+        for root in class_.__mro__[1:]:
+            if root not in cls.choices:
+                continue
+
+            previous = cls.names[root].get(name)
+            if previous is not None and (
+                previous.__module__,
+                previous.__qualname__,
+            ) == (class_.__module__, class_.__qualname__):
+                # a redefinition (e.g. a re-run cell) replaces the previous class
+                cls.choices[root].remove(previous)
+                if previous in cls.defaults[root]:
+                    cls.defaults[root].remove(previous)
+
+            cls.choices[root].append(class_)
+            cls.names[root][name] = class_
+
+            # subclasses of a default are no defaults of their own
+            if issubclass(class_, Selectable.Default) and not any(
+                issubclass(class_, default) for default in cls.defaults[root]
+            ):
+                cls.defaults[root].append(class_)
+
+
 def get_all_subclasses(what):
     collector = set()
 
@@ -109,6 +175,17 @@ def dict_to_kwarg_str(kwarg_dict):
 class SelectableManager(object):
     Selectable = Selectable
 
+    # instances of Selectable.Shared choices, (choice, args, kwargs) -> instance,
+    # least recently used ones are dropped beyond shared_maxsize
+    shared_instances = OrderedDict()
+    shared_maxsize = 32
+
+    # a SelectableManifest, listing choices whose modules are not imported yet
+    manifest = None
+
+    _shared_lock = allocate_lock()
+    _shared_constructing = {}
+
     @classmethod
     def resolve_selectable(cls, selectable_cls):
         if selectable_cls in selectable_cls.SelectableChoice.overrides:
@@ -119,11 +196,7 @@ class SelectableManager(object):
             if Selectable not in selectable_cls.__bases__:
                 result = selectable_cls
             else:
-                default = [
-                    choice
-                    for choice in selectable_cls.__subclasses__()
-                    if issubclass(choice, selectable_cls.Default)
-                ]
+                default = list(SelectableRegistry.defaults.get(selectable_cls, ()))
                 if len(default) > 1:
                     raise TypeError(
                         "Class %r with multiple defaults! %r"
@@ -132,6 +205,8 @@ class SelectableManager(object):
                             default,
                         )
                     )
+                if len(default) == 0 and cls._import_default(selectable_cls):
+                    return cls.resolve_selectable(selectable_cls)
                 if len(default) == 0:
                     raise TypeError(
                         "Class %r without implementation!" % (selectable_cls,)
@@ -160,20 +235,73 @@ class SelectableManager(object):
 
     @classmethod
     def instantiate_selectable(cls, selectable, args, kwargs):
+        compound_kwargs = {}
+        if selectable in selectable.SelectableChoice.parameters:
+            compound_kwargs.update(selectable.SelectableChoice.parameters[selectable])
+        compound_kwargs.update(kwargs)
+
+        if issubclass(selectable, Selectable.Shared):
+            return cls._shared_instance(selectable, args, compound_kwargs)
 
+        return cls._construct(selectable, args, compound_kwargs)
+
+    @classmethod
+    def _construct(cls, selectable, args, kwargs):
         cls.proxify_init(selectable)
 
         result = object.__new__(selectable)
+        result.__init__(*args, **kwargs)
 
-        compound_kwargs = {}
-        if selectable in selectable.SelectableChoice.parameters:
-            compound_kwargs.update(selectable.SelectableChoice.parameters[selectable])
-        compound_kwargs.update(kwargs)
+        return result
 
-        result.__init__(*args, **compound_kwargs)
+    @classmethod
+    def _shared_instance(cls, selectable, args, kwargs):
+        key = (selectable, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return cls._construct(selectable, args, kwargs)
+
+        instances = cls.shared_instances
+
+        with cls._shared_lock:
+            if key in instances:
+                instances.move_to_end(key)
+                return instances[key]
+            # concurrent requests for the same instance wait for one construction
+            constructing = cls._shared_constructing.setdefault(key, allocate_lock())
+
+        with constructing:
+            with cls._shared_lock:
+                if key in instances:
+                    return instances[key]
+
+            try:
+                result = cls._construct(selectable, args, kwargs)
+
+                with cls._shared_lock:
+                    instances[key] = result
+                    while len(instances) > cls.shared_maxsize:
+                        instances.popitem(last=False)
+            finally:
+                with cls._shared_lock:
+                    cls._shared_constructing.pop(key, None)
 
         return result
 
+    @classmethod
+    def clear_shared(cls, selectable=None):
+        """Drop the shared instances of selectable and its subclasses (or all)."""
+        with cls._shared_lock:
+            if selectable is None:
+                cls.shared_instances.clear()
+                return
+
+            for key in [
+                key for key in cls.shared_instances if issubclass(key[0], selectable)
+            ]:
+                del cls.shared_instances[key]
+
     @classmethod
     def create_selectable(cls, selectable_cls, args, kwargs, multiple=False):
         result = cls.resolve_selectable(selectable_cls)
@@ -191,49 +319,119 @@ class SelectableManager(object):
                 ]
         return cls.instantiate_selectable(result, args, kwargs)
 
+    @classmethod
+    def fan_out(cls, selectable, method, *args, timeout=None, **kwargs):
+        """
+        Call method(*args, **kwargs) on every chosen implementation of
+        selectable concurrently, returns a FanOutResult(choice, result, error)
+        per implementation, in choice order.
+        """
+        from .fanout import SelectableFanOut
+
+        return SelectableFanOut.run(selectable, method, args, kwargs, timeout)
+
+    @classmethod
+    def fan_out_stream(cls, selectable, method, *args, timeout=None, **kwargs):
+        """Like fan_out, but yield the results as implementations finish."""
+        from .fanout import SelectableFanOut
+
+        return SelectableFanOut.stream(selectable, method, args, kwargs, timeout)
+
     @classmethod
     def get(cls):
-        return {
-            c: [
-                cc
-                for cc in get_all_subclasses(c)
-                if Selectable.Virtual not in cc.__bases__
-            ]
-            for c in cls.Selectable.__subclasses__()
-        }
+        """{root: [choice, ...]}, maintained by SelectableRegistry (read only)."""
+        return SelectableRegistry.choices
+
+    @classmethod
+    def use_manifest(cls, manifest):
+        """Use a SelectableManifest (or the file name of one), None to stop."""
+        if isinstance(manifest, str):
+            from .manifest import SelectableManifest
+
+            manifest = SelectableManifest.load(manifest)
+
+        cls.manifest = manifest
+
+    @classmethod
+    def has_choice(cls, selectable, name):
+        """Whether name is a choice of selectable, without importing it."""
+        if name in SelectableRegistry.names.get(selectable, ()):
+            return True
+        return cls.manifest is not None and name in cls.manifest.get(selectable)
+
+    @classmethod
+    def get_choice_names(cls, selectable):
+        """Sorted names of all choices, including those only in the manifest."""
+        names = set(SelectableRegistry.names.get(selectable, ()))
+        if cls.manifest is not None:
+            names.update(cls.manifest.get(selectable))
+        return sorted(names)
+
+    @classmethod
+    def _import_choice(cls, selectable, name):
+        """Import the module of a choice only known from the manifest."""
+        if cls.manifest is None or name in SelectableRegistry.names.get(selectable, ()):
+            return False
+
+        entry = cls.manifest.get(selectable).get(name)
+        if entry is None:
+            return False
+
+        importlib.import_module(entry[0])
+        return True
+
+    @classmethod
+    def _import_default(cls, selectable):
+        if cls.manifest is None:
+            return False
+
+        imported = False
+        for name, (module, default) in cls.manifest.get(selectable).items():
+            if default and name not in SelectableRegistry.names.get(selectable, ()):
+                importlib.import_module(module)
+                imported = True
+
+        return imported
 
     @classmethod
     def get_choice_for_string(cls, selectable, choice):
         if isinstance(choice, type):
             choice = cls.class2name(choice)
-        for class_ in cls.get()[selectable]:
-            if cls.class2name(class_) == choice:
-                return class_
-        raise RuntimeError("Invalid choice passed.")
+        else:
+            cls._import_choice(selectable, choice)
+        try:
+            return SelectableRegistry.names[selectable][choice]
+        except KeyError:
+            raise RuntimeError("Invalid choice passed.")
 
     @classmethod
     def defaults(cls):
-        return {
-            c: [cc for cc in l if issubclass(cc, Selectable.Default)]
-            for c, l in cls.get().items()
-        }
+        return SelectableRegistry.defaults
 
     @classmethod
     def _pick(cls, selectable, choice):
         if not issubclass(selectable, Selectable):
             raise TypeError("Wrong arguments passed.")
 
-        return next(
-            possible_choice
-            for possible_choice in cls.get()[selectable]
-            if possible_choice == choice or cls.class2name(possible_choice) == choice
-        )
+        if isinstance(choice, type):
+            pick = SelectableRegistry.names[selectable].get(cls.class2name(choice))
+            if pick is choice:
+                return pick
+        else:
+            cls._import_choice(selectable, choice)
+            if choice in SelectableRegistry.names[selectable]:
+                return SelectableRegistry.names[selectable][choice]
+
+        raise RuntimeError("Invalid choice passed.")
 
     @classmethod
     def set(cls, selectable, choice):
-        selectable.SelectableChoice.overrides[selectable] = cls._pick(
-            selectable, choice
-        )
+        pick = cls._pick(selectable, choice)
+        overrides = selectable.SelectableChoice.overrides
+
+        if overrides.get(selectable) is not pick:
+            overrides[selectable] = pick
+            cls.clear_shared(selectable)
 
     @classmethod
     def add(cls, selectable, choice):
@@ -247,12 +445,14 @@ class SelectableManager(object):
             overrides[selectable] = [overrides[selectable]]
 
         overrides[selectable].append(pick)
+        cls.clear_shared(selectable)
 
     @classmethod
     def set_default_parameters(cls, selectable, parameters):
         if selectable not in selectable.SelectableChoice.parameters:
             selectable.SelectableChoice.parameters[selectable] = {}
         selectable.SelectableChoice.parameters[selectable].update(parameters)
+        cls.clear_shared(selectable)
 
     @classmethod
     def class2name(cls, c, with_parameters=False):
@@ -276,18 +476,26 @@ class SelectableManager(object):
     def register_selectable_as_tunable(cls, class_):
         available = cls.get()
         if class_ in available:
-            from .tunable import Tunable, classproperty
+            from .tunable import Tunable
+            from .tunablemanager import TunableManager
 
             def _get(cls_):
-                cls_.default = ''
-                cls_.set(cls_.default)
-                cls_.value = classproperty(_get)
+                # computed upon every read, nothing is stored
                 return cls.class2name(
                     cls.resolve_selectable(class_), with_parameters=True
                 )
 
-            def _set_wrapper(cls_, value):
+            def _test(cls_, value):
+                if not value:
+                    return True
+                values, _ = parse_class_name_with_kwargs(value)
+                return cls.has_choice(cls_._corresponding_selectable, values)
+
+            def _commit_wrapper(cls_, value):
                 if value:
+                    if TunableManager.frozen is not None:
+                        raise TunableError('Tunables are frozen', cls_)
+
                     mapped_selectable = cls_._corresponding_selectable
 
                     values, the_kwargs = parse_class_name_with_kwargs(value)
@@ -305,35 +513,49 @@ class SelectableManager(object):
                             the_kwargs,
                         )
                 # TODO: this will not be enough to auto-load modules
-                return cls_._real_set(value)
+                result = cls_._real_commit(value)
+                # the value stays computed from the selection, bypassing
+                # TunableMeta.__setattr__ as the setters stay valid
+                type.__setattr__(cls_, 'value', computed)
+                return result
 
+            computed = classproperty(_get)
+
+            # the module needs to be known upon creation, as
+            # the tunable registers itself under its names right away
             shadow_tunable = type(
-                class_.__name__, (Tunable,), dict(default='', value=classproperty(_get))
+                class_.__name__,
+                (Tunable,),
+                dict(
+                    default='',
+                    type_=str,
+                    value=computed,
+                    __module__=class_.__module__,
+                ),
             )
-            shadow_tunable.__module__ = class_.__module__
-            shadow_tunable._real_set = shadow_tunable.set
-            shadow_tunable.set = classmethod(_set_wrapper)
+            shadow_tunable._real_commit = shadow_tunable._commit
+            shadow_tunable._commit = classmethod(_commit_wrapper)
+            shadow_tunable.test = classmethod(_test)
             shadow_tunable._corresponding_selectable = class_
             class_._selectable_shadow_tunable = shadow_tunable
 
-    import argparse
-
     @classmethod
     def register_argparser(cls, parser):
 
         defaults = cls.defaults()
-        for class_, choice in sorted(
-            SelectableManager.get().items(), key=lambda _cc: cls.class2name(_cc[0])
-        ):
+        for class_ in sorted(SelectableManager.get(), key=cls.class2name):
             name = cls.class2name(class_)
             token = parser.prefix_chars[0:1] * 2 + name
-            choices = [
-                cls.class2name(c)
-                for c in sorted(choice, key=lambda _c: cls.class2name(_c))
-            ]
+            choices = cls.get_choice_names(class_)
             default = (
                 defaults[class_] if class_ in defaults and defaults[class_] else None
             )  # choices[0]
+            if default is None and cls.manifest is not None:
+                default = [
+                    name
+                    for name, (_, is_default) in cls.manifest.get(class_).items()
+                    if is_default
+                ] or None
             # TODO: the default will be in the parser's parsed args, \
             #  but will not be set via ArgparseAction
             parser.add_argument(
@@ -362,46 +584,14 @@ class SelectableManager(object):
                             ModuleHelper.load_module(value)
                         except ImportError:
                             pass  # this time we're silent
-                    choice = SelectableManager.get()[class_]
-                    action.choices = [
-                        cls.class2name(c)
-                        for c in sorted(choice, key=lambda _c: cls.class2name(_c))
-                    ]
+                    action.choices = cls.get_choice_names(class_)
 
             self._real_check_value(action, value)
 
         parser._check_value = _monkey_patch_check_value
 
-    # noinspection PyClassHasNoInit
-    class ArgparseAction(argparse.Action):
-        mapping = {}
-
-        def __call__(self, parser, namespace, values, option_string=None):
-            if option_string in self.__class__.mapping:
-                mapped_selectable = self.__class__.mapping[option_string]
-
-                class_name = SelectableManager.class2name(mapped_selectable)
+    @classproperty
+    def ArgparseAction(cls):
+        from .argparseactions import SelectableArgparseAction
 
-                if SelectableManager.is_multiple(mapped_selectable):
-                    setattr(
-                        namespace,
-                        class_name,
-                        getattr(namespace, class_name, []) + [values],
-                    )
-                else:
-                    setattr(namespace, class_name, values)
-
-                values, the_kwargs = parse_class_name_with_kwargs(values)
-
-                if SelectableManager.is_multiple(mapped_selectable):
-                    SelectableManager.add(mapped_selectable, values)
-                else:
-                    SelectableManager.set(mapped_selectable, values)
-
-                if the_kwargs:
-                    SelectableManager.set_default_parameters(
-                        SelectableManager.get_choice_for_string(
-                            mapped_selectable, values
-                        ),
-                        the_kwargs,
-                    )
+        return SelectableArgparseAction
@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""
+Optional backend keeping bool, int and float tunables in a memory mapped
+table, shared between processes.
+
+A controlling process creates the table, worker processes attach to it
+(e.g. as pool initializer). Afterwards, Tunable.value in every attached
+process reflects the current table contents without any IPC: a generation
+counter in the table header is compared upon access, and the values are
+only re-read (lock-free, seqlock style) once it changed::
+
+    table = SharedTunableTable.create()
+    pool = Pool(initializer=SharedTunableTable.attach, initargs=(table.path,))
+
+    SomeTunable.set(2.0)  # visible in all workers
+
+Values should only be set from one process at a time.
+"""
+
+import json
+import mmap
+import os
+import sys
+import tempfile
+
+from .tunable import TunableError, TunableRegistry, ValueProperty, classproperty
+
+_MAGIC = int.from_bytes(b'TUNABLE1', 'little')
+_HEADER_SIZE = 4 * 8
+_SLOT_SIZE = 8
+
+_TYPECODES = {bool: 'b', int: 'q', float: 'd'}
+_INT_MIN, _INT_MAX = -(1 << 63), (1 << 63) - 1
+
+
+class SharedValue(ValueProperty):
+    """Installed as value of tunables bound to a SharedTunableTable."""
+
+    __slots__ = ('table', 'index')
+
+    def __init__(self, table, index):
+        super().__init__()
+        self.table = table
+        self.index = index
+
+    def _get(self, cls):
+        table = self.table
+        if table.header[1] != table.generation:
+            table.refresh()
+        return table.values[self.index]
+
+    def _set(self, cls, value):
+        self.table.write(self.index, value)
+
+
+class SharedTunableTable(object):
+    """Memory mapped table of tunable values, see the module documentation."""
+
+    def __init__(self, path, owner=False):
+        self.path = path
+        self.owner = owner
+        self.bound = set()
+
+        with open(path, 'r+b') as fp:
+            self._mmap = mmap.mmap(fp.fileno(), 0)
+
+        self._view = memoryview(self._mmap)
+        self.header = self._view[:_HEADER_SIZE].cast('q')
+
+        if self.header[0] != _MAGIC:
+            self.close()
+            raise TunableError('Not a shared tunable table: %s' % (path,))
+
+        count, layout_length = self.header[2], self.header[3]
+        slots_end = _HEADER_SIZE + count * _SLOT_SIZE
+
+        self._ints = self._view[_HEADER_SIZE:slots_end].cast('q')
+        self._floats = self._view[_HEADER_SIZE:slots_end].cast('d')
+
+        self.layout = [
+            (name, typecode)
+            for name, typecode in json.loads(
+                bytes(self._view[slots_end : slots_end + layout_length]).decode()
+            )
+        ]
+
+        self._readers = [
+            (
+                (self._floats, index, float)
+                if typecode == 'd'
+                else (self._ints, index, bool if typecode == 'b' else int)
+            )
+            for index, (_, typecode) in enumerate(self.layout)
+        ]
+
+        self.generation = -1
+        self.values = []
+
+    @staticmethod
+    def _layout(tunables=None):
+        """([(name, typecode), ...], [value, ...]) of the tunables to share."""
+        if tunables is None:
+            candidates = TunableRegistry.sorted_classes()
+        else:
+            candidates = [
+                TunableRegistry.lookup(t) if isinstance(t, str) else t for t in tunables
+            ]
+
+        layout, values = [], []
+        for class_ in candidates:
+            hook = class_.__dict__.get('value')
+            if isinstance(hook, classproperty) and hook.fset is None:
+                continue  # computed upon access
+
+            value = class_.value  # also determines type_
+
+            if class_.type_ not in _TYPECODES:
+                if tunables is not None:
+                    raise TunableError('Unsupported type for shared table', class_)
+                continue
+
+            layout.append(
+                (TunableRegistry.semilong_name(class_), _TYPECODES[class_.type_])
+            )
+            values.append(value)
+
+        return layout, values
+
+    @classmethod
+    def create(cls, tunables=None, path=None, bind=True):
+        """
+        Create a table of the passed tunables (classes or names), by default
+        all bool, int or float tunables, initialized to their current values.
+        The type is the one Tunable.set derived from default or type_.
+        """
+        layout, values = cls._layout(tunables)
+
+        if path is None:
+            directory = '/dev/shm' if os.path.isdir('/dev/shm') else None
+            fd, path = tempfile.mkstemp(
+                prefix='tunables-', suffix='.table', dir=directory
+            )
+            os.close(fd)
+
+        layout_data = json.dumps(layout).encode()
+
+        with open(path, 'wb') as fp:
+            fp.write(
+                b''.join(
+                    n.to_bytes(8, sys.byteorder, signed=True)
+                    for n in (_MAGIC, 0, len(layout), len(layout_data))
+                )
+            )
+            fp.write(bytes(len(layout) * _SLOT_SIZE))
+            fp.write(layout_data)
+
+        table = cls(path, owner=True)
+
+        for index, value in enumerate(values):
+            table.write(index, value)
+
+        if bind:
+            table.bind()
+
+        return table
+
+    @classmethod
+    def attach(cls, path, bind=True):
+        """Attach to an existing table, binding all tunables known locally."""
+        table = cls(path)
+        if bind:
+            table.bind()
+        return table
+
+    def refresh(self):
+        header = self.header
+
+        while True:
+            generation = header[1]
+            if generation & 1:
+                continue  # a write is in progress
+
+            values = [convert(view[index]) for view, index, convert in self._readers]
+
+            if header[1] == generation:
+                break
+
+        self.values = values
+        self.generation = generation
+
+    def write(self, index, value):
+        typecode = self.layout[index][1]
+
+        if typecode == 'q' and not _INT_MIN <= value <= _INT_MAX:
+            raise TunableError('Value out of range for shared table', value)
+
+        header = self.header
+        generation = header[1]
+
+        header[1] = generation + 1
+        if typecode == 'd':
+            self._floats[index] = value
+        else:
+            self._ints[index] = int(value)
+        header[1] = generation + 2
+
+    def bind(self):
+        """Install the table as value of all tunables it contains."""
+        for index, (name, _) in enumerate(self.layout):
+            try:
+                class_ = TunableRegistry.lookup(name)
+            except TunableError:
+                continue  # not defined within this process
+
+            if class_ in self.bound:
+                continue
+
+            hook = class_.__dict__.get('value')
+            # a forked process inherits the binding of its parent
+            inherited = isinstance(hook, SharedValue) and hook.table.path == self.path
+
+            if isinstance(hook, classproperty) and not inherited:
+                raise TunableError('Tunable is overridden or computed', class_)
+
+            class_.value = SharedValue(self, index)
+            self.bound.add(class_)
+            TunableRegistry.dirty.add(class_)
+
+    def unbind(self):
+        """Restore the tunables, keeping the last value of the table."""
+        for class_ in self.bound:
+            hook = class_.__dict__.get('value')
+            if isinstance(hook, SharedValue) and hook.table is self:
+                class_.value = hook.fget(class_)
+                TunableRegistry.dirty.add(class_)
+
+        self.bound = set()
+
+    def close(self):
+        self.unbind()
+
+        for view in ('_ints', '_floats', 'header', '_view'):
+            if hasattr(self, view):
+                getattr(self, view).release()
+                delattr(self, view)
+
+        self._mmap.close()
+
+        if self.owner:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
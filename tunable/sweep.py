@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+Parameter sweeps over tunables.
+
+A TunableSweep expands value lists (or ranges) of several tunables lazily,
+as cartesian ('product') or zipped ('zip') product, and runs a function for
+every point in a process pool. Points whose hash is found in a completed
+results index are skipped, so interrupted sweeps can be resumed::
+
+    sweep = TunableSweep()
+    sweep.add('Threshold', '0.1:0.5:0.1')
+    sweep.add('Iterations', [10, 100])
+
+    for point, hash_value, result in sweep.run(analysis, index='done.jsonl'):
+        ...
+"""
+
+import hashlib
+import itertools
+import json
+import os
+from base64 import b64encode
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from decimal import Decimal
+
+from .schema import ASN1_SCHEMA_VERSION, tunable_der
+from .tunable import TunableError, TunableRegistry
+from .tunablemanager import TunableManager
+
+
+def _numeric_range(start, stop, step, type_):
+    """Inclusive range from start to stop, for int as well as float types."""
+    start, stop, step = type_(start), type_(stop), type_(step)
+
+    if step == 0 or (stop - start) * step < 0:
+        raise TunableError('Invalid sweep range %r:%r:%r' % (start, stop, step))
+
+    if type_ is int:
+        return list(range(start, stop + (1 if step > 0 else -1), step))
+
+    count = int(round((stop - start) / step))
+    if abs(start + count * step - stop) > abs(step) * 1e-9:
+        count = int((stop - start) / step)
+
+    # start + n * step accumulates representation errors (0.1 + 2 * 0.1 is
+    # 0.30000000000000004), hence rounded to the decimals of start and step
+    places = max(_decimal_places(start), _decimal_places(step))
+
+    return [round(start + n * step, places) for n in range(count + 1)]
+
+
+def _decimal_places(value):
+    return max(-Decimal(repr(value)).as_tuple().exponent, 0)
+
+
+def parse_sweep_values(class_, values):
+    """
+    Parse the values of a sweep, either 'a,b,c' or 'start:stop[:step]' (stop
+    inclusive), returns a list of (unconverted) values.
+    """
+    if ':' in values and class_.type_ in (int, float):
+        pieces = values.split(':')
+        if len(pieces) == 2:
+            pieces.append('1')
+        if len(pieces) != 3:
+            raise TunableError('Invalid sweep range "%s"' % (values,))
+        return _numeric_range(*pieces, type_=class_.type_)
+
+    return values.split(',')
+
+
+class TunableSweep(object):
+    modes = ('product', 'zip')
+
+    def __init__(self, mode='product'):
+        if mode not in self.modes:
+            raise TunableError('Unsupported sweep mode "%s"' % (mode,))
+
+        self.mode = mode
+        self.axes = []
+
+    def add(self, key, values=None):
+        """
+        Add a tunable to sweep over. values may be an iterable, a string as
+        understood by parse_sweep_values, or None to use the tunable's range.
+        Every value is converted and checked (including range and test()).
+        """
+        class_ = TunableManager.lookup(key)
+
+        # noinspection PyStatementEffect
+        class_.value  # determines type_
+
+        if values is None:
+            if class_.range is None:
+                raise TunableError('Tunable has no range to sweep over', class_)
+            values = class_.range
+        elif isinstance(values, str):
+            values = parse_sweep_values(class_, values)
+
+        converted = []
+        for value in values:
+            converted.append(class_.validate(value))
+
+        if not converted:
+            raise TunableError('Empty sweep', class_)
+
+        self.axes = [(k, v) for k, v in self.axes if TunableManager.lookup(k) != class_]
+        self.axes.append((key, converted))
+
+        return self
+
+    def add_from_string(self, text):
+        """Add 'Name=a,b,c' or 'Name=start:stop[:step]'."""
+        key, _, values = text.partition('=')
+        return self.add(key, values)
+
+    def __len__(self):
+        lengths = [len(values) for _, values in self.axes]
+
+        if not lengths:
+            return 0
+
+        if self.mode == 'zip':
+            return min(lengths)
+
+        result = 1
+        for length in lengths:
+            result *= length
+        return result
+
+    def __iter__(self):
+        """Lazily yield every point as {key: value} dictionary."""
+        if not self.axes:
+            return
+
+        keys = [key for key, _ in self.axes]
+        combine = itertools.product if self.mode == 'product' else zip
+
+        for values in combine(*(values for _, values in self.axes)):
+            yield dict(zip(keys, values))
+
+    @staticmethod
+    def get_hash(point):
+        """
+        The hash of all tunables, with the point applied. Tunables of the
+        point not taking part in it (hash = False) are hashed in addition,
+        as otherwise their points would not be told apart.
+        """
+        with TunableManager.override(point):
+            hash_value = TunableManager.get_hash()
+
+        unhashed = sorted(
+            (TunableRegistry.semilong_name(class_), value)
+            for class_, value in (
+                (TunableManager.lookup(key), value) for key, value in point.items()
+            )
+            if not class_.hash
+        )
+
+        if not unhashed:
+            return hash_value
+
+        digest = hashlib.sha256(
+            tunable_der.encode(ASN1_SCHEMA_VERSION, unhashed, exact=True)
+        ).digest()
+
+        return '%s+SHA256:%s' % (hash_value, b64encode(digest).decode())
+
+    def run(self, function, processes=None, index=None):
+        """
+        Call function() for every point not yet in index, with the point's
+        tunable values applied, and yield (point, hash, result) tuples in
+        order of completion.
+
+        index may be a SweepIndex, a file name (opened as SweepIndex), or
+        any container supporting `in` and add(hash_value, point, result).
+        Workers are initialized with the current tunable and selectable
+        state. With processes=0, everything is run within this process.
+        """
+        if isinstance(index, str):
+            index = SweepIndex(index)
+
+        if processes == 0:
+            results = (
+                (point, hash_value, _run_point(function, point))
+                for point, hash_value in self._pending(index)
+            )
+        else:
+            results = self._run_pool(function, processes, self._pending(index))
+
+        for point, hash_value, result in results:
+            if index is not None:
+                index.add(hash_value, point, result)
+            yield point, hash_value, result
+
+    def _pending(self, index):
+        """(point, hash) of all points not in index."""
+        for point in self:
+            hash_value = self.get_hash(point)
+            if index is None or hash_value not in index:
+                yield point, hash_value
+
+    @staticmethod
+    def _run_pool(function, processes, points):
+        from .tunableselectable import TunableSelectable
+
+        with ProcessPoolExecutor(
+            max_workers=processes, **TunableSelectable.get_pool_kwargs()
+        ) as executor:
+            window = 2 * (processes or os.cpu_count() or 1)
+            running = {}
+
+            # only a window of points is submitted at once, as they are lazy
+            for point, hash_value in points:
+                future = executor.submit(_run_point, function, point)
+                running[future] = (point, hash_value)
+
+                if len(running) >= window:
+                    yield from _completed(running)
+
+            while running:
+                yield from _completed(running)
+
+
+def _completed(running):
+    """Wait for any of the running futures, yield (point, hash, result)."""
+    done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+    for future in done:
+        point, hash_value = running.pop(future)
+        yield point, hash_value, future.result()
+
+
+def _run_point(function, point):
+    with TunableManager.override(point):
+        return function()
+
+
+class SweepIndex(object):
+    """
+    Index of completed sweep points, kept as JSON lines file of
+    {"hash": ..., "point": ..., "result": ...}; results which can not be
+    represented as JSON are stored as null.
+    """
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.results = {}
+
+        if os.path.exists(file_name):
+            with open(file_name) as fp:
+                for line in fp:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # e.g. a partially written last line
+                    self.results[entry['hash']] = entry.get('result')
+
+    def __contains__(self, hash_value):
+        return hash_value in self.results
+
+    def __len__(self):
+        return len(self.results)
+
+    def get(self, hash_value, default=None):
+        return self.results.get(hash_value, default)
+
+    def add(self, hash_value, point, result=None):
+        try:
+            line = json.dumps(dict(hash=hash_value, point=point, result=result))
+        except (TypeError, ValueError):
+            line = json.dumps(dict(hash=hash_value, point=point, result=None))
+            result = None
+
+        with open(self.file_name, 'a') as fp:
+            fp.write(line + '\n')
+
+        self.results[hash_value] = result
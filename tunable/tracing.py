@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+Opt-in access tracing of tunables.
+
+While enabled, reads and writes of every tunable are counted, the first
+reading and writing call sites are recorded, as well as the time spent in
+type conversion and in checks (range and test()). Statistics are grouped by
+the innermost active region::
+
+    TunableTracer.enable()
+
+    with TunableTracer.region('segmentation'):
+        ...
+
+    TunableTracer.save('trace.json')
+
+While disabled, nothing of this is installed, tunables are not slowed down.
+"""
+
+import json
+import os
+import sys
+from _thread import allocate_lock
+from contextvars import ContextVar
+from time import perf_counter
+
+from .tunable import TunableError, TunableMeta, TunableRegistry
+
+GLOBAL_REGION = '<global>'
+
+_region = ContextVar('tunable_region', default=GLOBAL_REGION)
+
+_package_directory = os.path.dirname(os.path.abspath(__file__))
+
+
+def _call_site(depth):
+    frame = sys._getframe(depth)
+
+    # reads by e.g. Tunable.__new__ are attributed to their caller
+    while (
+        frame is not None
+        and os.path.dirname(os.path.abspath(frame.f_code.co_filename))
+        == _package_directory
+    ):
+        frame = frame.f_back
+
+    if frame is None:
+        return None
+
+    return '%s:%d (%s)' % (
+        frame.f_code.co_filename,
+        frame.f_lineno,
+        frame.f_code.co_name,
+    )
+
+
+class TraceStatistics(object):
+    __slots__ = (
+        'reads',
+        'writes',
+        'validations',
+        'first_reader',
+        'first_writer',
+        'convert_time',
+        'test_time',
+    )
+
+    def __init__(self):
+        self.reads = 0
+        self.writes = 0
+        self.validations = 0
+        self.first_reader = None
+        self.first_writer = None
+        self.convert_time = 0.0
+        self.test_time = 0.0
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class TracingRegion(object):
+    """Groups all accesses within, nested regions are joined by '/'."""
+
+    def __init__(self, name):
+        self.name = name
+        self._token = None
+
+    def __enter__(self):
+        outer = _region.get()
+        self._token = _region.set(
+            self.name if outer == GLOBAL_REGION else outer + '/' + self.name
+        )
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _region.reset(self._token)
+
+
+def _statistics(cls):
+    region = _region.get()
+    regions = TunableTracer.statistics
+
+    try:
+        return regions[region][cls]
+    except KeyError:
+        with TunableTracer._lock:
+            return regions.setdefault(region, {}).setdefault(cls, TraceStatistics())
+
+
+def _on_read(cls, value):
+    if cls not in TunableRegistry.classes:
+        return
+
+    statistics = _statistics(cls)
+    statistics.reads += 1
+
+    if statistics.first_reader is None:
+        # frames: _on_read, _hooked_getattribute, reader
+        statistics.first_reader = _call_site(2)
+
+
+def _traced_validate(cls, value):
+    statistics = _statistics(cls)
+    statistics.validations += 1
+
+    start = perf_counter()
+    try:
+        value = cls._convert(value)
+    finally:
+        converted = perf_counter()
+        statistics.convert_time += converted - start
+
+    try:
+        cls._check_range(value)
+
+        if cls.test is not None and not cls.test(value):
+            raise TunableError('test() failed!')
+    finally:
+        statistics.test_time += perf_counter() - converted
+
+    return value
+
+
+def _compile_traced(cls):
+    def validate(value):
+        return _traced_validate(cls, value)
+
+    def set(value):
+        value = validate(value)
+        cls._commit(value)
+        return value
+
+    return validate, set
+
+
+def _on_commit(cls, value):
+    statistics = _statistics(cls)
+    statistics.writes += 1
+
+    if statistics.first_writer is None:
+        statistics.first_writer = _call_site(1)
+
+
+class TunableTracer(object):
+    enabled = False
+    statistics = {}
+
+    _lock = allocate_lock()
+
+    @classmethod
+    def enable(cls, reset=True):
+        if reset:
+            cls.reset()
+
+        if cls.enabled:
+            return
+
+        # adding a commit hook rebuilds validate and set of all tunables,
+        # which are then built by the compile hook
+        TunableMeta.compile_hook = _compile_traced
+        TunableMeta.add_commit_hook(_on_commit)
+        TunableMeta.add_read_hook(_on_read)
+
+        cls.enabled = True
+
+    @classmethod
+    def disable(cls):
+        if not cls.enabled:
+            return
+
+        TunableMeta.remove_read_hook(_on_read)
+        TunableMeta.compile_hook = None
+        TunableMeta.remove_commit_hook(_on_commit)
+
+        cls.enabled = False
+
+    @classmethod
+    def reset(cls):
+        cls.statistics = {}
+
+    @staticmethod
+    def region(name):
+        return TracingRegion(name)
+
+    @classmethod
+    def get_report(cls):
+        """
+        Statistics per region and tunable (semilong names), and the list of
+        tunables which have not been read at all.
+        """
+        regions = {}
+        used = set()
+
+        for region, per_class in list(cls.statistics.items()):
+            regions[region] = {
+                TunableRegistry.semilong_name(class_): statistics.to_dict()
+                for class_, statistics in list(per_class.items())
+            }
+            used.update(
+                class_ for class_, statistics in per_class.items() if statistics.reads
+            )
+
+        return {
+            'regions': regions,
+            'unused': [
+                TunableRegistry.semilong_name(class_)
+                for class_ in TunableRegistry.sorted_classes()
+                if class_ not in used
+            ],
+        }
+
+    @classmethod
+    def save(cls, file_name):
+        with open(file_name, 'w+') as fp:
+            json.dump(cls.get_report(), fp, indent=4, sort_keys=True)
@@ -3,6 +3,10 @@
 documentation
 """
 
+from array import array
+
+from .arrays import array_in_range, to_array
+
 
 def fancybool(value):
     if isinstance(value, type('')):
@@ -39,11 +43,13 @@ class TunableError(RuntimeError):
 class classproperty(object):
     __slots__ = (
         'fget',
+        'fset',
         '__doc__',
     )
 
-    def __init__(self, fget=None, doc=None):
+    def __init__(self, fget=None, doc=None, fset=None):
         self.fget = fget
+        self.fset = fset
 
         if doc is None and fget is not None:
             doc = fget.__doc__
@@ -54,7 +60,394 @@ class classproperty(object):
         return self.fget(cls)
 
 
-class Tunable(object):
+class ValueProperty(classproperty):
+    """
+    Base of settable classproperties installed as value of a tunable, which
+    get and store the value by their _get and _set methods.
+    """
+
+    __slots__ = ()
+
+    def __init__(self):
+        # the class docstring takes precedence over the __doc__ slot
+        self.fget = self._get
+        self.fset = self._set
+
+    def _get(self, cls):
+        raise NotImplementedError
+
+    def _set(self, cls, value):
+        raise NotImplementedError
+
+
+class Interval(object):
+    """Closed interval for use as Tunable.range, None bounds are unbounded."""
+
+    __slots__ = ('lower', 'upper')
+
+    def __init__(self, lower=None, upper=None):
+        self.lower = lower
+        self.upper = upper
+
+    def __contains__(self, value):
+        try:
+            return (self.lower is None or self.lower <= value) and (
+                self.upper is None or value <= self.upper
+            )
+        except TypeError:
+            return False
+
+    def __repr__(self):
+        return 'Interval(%r, %r)' % (self.lower, self.upper)
+
+
+def range_membership(range_):
+    """
+    Return a predicate whether a value lies within range_. range objects
+    include their stop value and are checked in O(1) for integral values of
+    any type, sets and Interval in O(1) as well, other containers by `in`.
+    """
+    if type(range_) is range:
+
+        def contains(value):
+            if type(value) is not int:
+                try:
+                    if value != int(value):
+                        return False
+                except (TypeError, ValueError, OverflowError):
+                    return False
+                value = int(value)
+
+            return value in range_ or value == range_.stop
+
+        return contains
+
+    return range_.__contains__
+
+
+class TunableRegistry(object):
+    """
+    Incrementally maintained index of all (leaf) Tunable classes.
+
+    Tunable classes register themselves upon definition, a class stops being
+    a tunable as soon as it gets subclassed (i.e. only leaves are tunables).
+    Names are resolved via the long (module.Name), semilong (long, but
+    without __main__) and short (Name) tables.
+    """
+
+    classes = {}
+
+    long = {}
+    semilong = {}
+    short = {}
+
+    # __mp_main__ is the main module within multiprocessing spawned processes
+    main_modules = ('__main__', '__mp_main__')
+
+    # classes whose value changed, or which were added, since last checked
+    dirty = set()
+    # classes whose value is computed upon access and cannot be tracked
+    volatile = set()
+    # changes whenever classes are added or removed
+    generation = 0
+
+    _sorted = None
+
+    @staticmethod
+    def long_name(class_):
+        return class_.__module__ + '.' + class_.__name__
+
+    @classmethod
+    def semilong_name(cls, class_):
+        if class_.__module__ in cls.main_modules:
+            return class_.__name__
+        return cls.long_name(class_)
+
+    @staticmethod
+    def short_name(class_):
+        return class_.__name__
+
+    @staticmethod
+    def qualified_name(class_):
+        return class_.__module__ + '.' + class_.__qualname__
+
+    @classmethod
+    def _tables(cls, class_):
+        return (
+            (cls.long, cls.long_name(class_)),
+            (cls.semilong, cls.semilong_name(class_)),
+            (cls.short, cls.short_name(class_)),
+        )
+
+    @classmethod
+    def add(cls, class_):
+        for base in class_.__bases__:
+            if base in cls.classes:
+                cls.remove(base)
+
+        # a redefinition (e.g. a re-run cell) replaces the previous class,
+        # classes defined within functions (e.g. by Tunable(default=...)) are
+        # distinct per call, any other name clash is a collision
+        if '<locals>' not in class_.__qualname__:
+            for previous in list(cls.long.get(cls.long_name(class_), ())):
+                if previous.__qualname__ == class_.__qualname__:
+                    cls.remove(previous)
+
+        names = cls._tables(class_)
+        cls.classes[class_] = names
+
+        for table, name in names:
+            table.setdefault(name, []).append(class_)
+
+        cls.dirty.add(class_)
+        cls.generation += 1
+        cls._sorted = None
+
+    @classmethod
+    def remove(cls, class_):
+        names = cls.classes.pop(class_, None)
+
+        if names is None:
+            return
+
+        for table, name in names:
+            entries = table[name]
+            entries.remove(class_)
+            if not entries:
+                del table[name]
+
+        cls.dirty.discard(class_)
+        cls.volatile.discard(class_)
+        cls.generation += 1
+
+        _validated.discard(class_)
+        _set.discard(class_)
+        cls._sorted = None
+
+    @classmethod
+    def lookup(cls, key):
+        for table in (cls.long, cls.semilong, cls.short):
+            entries = table.get(key)
+            if entries:
+                if len(entries) > 1:
+                    raise TunableError(
+                        "Tunable name \"%s\" is ambiguous, candidates: %s"
+                        % (key, ', '.join(sorted(map(cls.qualified_name, entries))))
+                    )
+                return entries[0]
+
+        raise TunableError("Tunable \"%s\" does not exist." % (key,))
+
+    @classmethod
+    def collisions(cls):
+        return {
+            name: sorted(map(cls.qualified_name, entries))
+            for name, entries in cls.short.items()
+            if len(entries) > 1
+        }
+
+    @classmethod
+    def sorted_classes(cls):
+        if cls._sorted is None:
+            cls._sorted = sorted(
+                cls.classes,
+                key=lambda p: (
+                    p.__module__,
+                    p.__name__,
+                ),
+            )
+        return cls._sorted
+
+
+def _hooked_getattribute(cls, name):
+    value = type.__getattribute__(cls, name)
+
+    if name == 'value':
+        for hook in TunableMeta._read_hooks:
+            hook(cls, value)
+
+    return value
+
+
+# sets class attributes bypassing TunableMeta.__setattr__
+_setattr = type.__setattr__
+
+# attributes the specialised validate and set of a Tunable depend on,
+# value as installing a settable classproperty changes how it is stored
+_SETTER_DEPENDENCIES = frozenset(
+    (
+        'value',
+        'default',
+        'type_',
+        'convert_type',
+        'typecode',
+        'range',
+        'test',
+        'validate',
+        'set',
+        '_convert',
+        '_check_range',
+        '_commit',
+    )
+)
+
+
+class TunableMeta(type):
+    """
+    Metaclass of Tunable. Attribute access is only routed through Python code
+    while read hooks are registered, i.e. it costs nothing otherwise.
+
+    Tunables used repeatedly get their own validate and set, specialised for
+    their attributes, which are dropped whenever one of these changes.
+    """
+
+    _read_hooks = ()
+    _commit_hooks = ()
+
+    # if set, called as compile_hook(cls) to build (validate, set) instead
+    # of the specialised versions, e.g. to instrument them
+    compile_hook = None
+
+    def __setattr__(cls, name, value):
+        type.__setattr__(cls, name, value)
+        if name in _SETTER_DEPENDENCIES:
+            TunableMeta.invalidate(cls)
+
+    def __delattr__(cls, name):
+        type.__delattr__(cls, name)
+        if name in _SETTER_DEPENDENCIES:
+            TunableMeta.invalidate(cls)
+
+    @staticmethod
+    def invalidate(cls=None):
+        """Drop the specialised validate and set of cls (default: all tunables)
+        and its subclasses, to be rebuilt upon use."""
+        pending = [cls] if cls is not None else Tunable.__subclasses__()
+
+        while pending:
+            class_ = pending.pop()
+            _drop_specialised(class_)
+            pending.extend(class_.__subclasses__())
+
+    @staticmethod
+    def add_read_hook(hook):
+        """Call hook(cls, value) upon every read of a Tunable's value."""
+        TunableMeta._read_hooks += (hook,)
+        TunableMeta.__getattribute__ = _hooked_getattribute
+
+    @staticmethod
+    def remove_read_hook(hook):
+        hooks = list(TunableMeta._read_hooks)
+        hooks.remove(hook)
+        TunableMeta._read_hooks = tuple(hooks)
+
+        if not hooks:
+            del TunableMeta.__getattribute__
+
+    @staticmethod
+    def add_commit_hook(hook):
+        """
+        Call hook(cls, value) before every value of a Tunable is stored,
+        it may raise to prevent that. Hooks are called in order of adding.
+        """
+        TunableMeta._commit_hooks += (hook,)
+        TunableMeta.invalidate()
+
+    @staticmethod
+    def remove_commit_hook(hook):
+        hooks = list(TunableMeta._commit_hooks)
+        hooks.remove(hook)
+        TunableMeta._commit_hooks = tuple(hooks)
+        TunableMeta.invalidate()
+
+
+# code objects of installed (specialised or stub) validate and set functions
+_compiled_codes = set()
+
+# tunables which used the generic validate respectively set once already,
+# most are only set once, by their first access
+_validated = set()
+_set = set()
+
+
+def _is_compiled(attribute):
+    function = getattr(attribute, '__func__', None)
+    return getattr(function, '__code__', None) in _compiled_codes
+
+
+def _install(cls, validate, set):
+    _compiled_codes.update((validate.__code__, set.__code__))
+
+    _setattr(cls, 'validate', staticmethod(validate))
+    _setattr(cls, 'set', staticmethod(set))
+
+
+def _inherits_specialised(cls):
+    for class_ in cls.__mro__[1:]:
+        if 'set' in class_.__dict__ or 'validate' in class_.__dict__:
+            return _is_compiled(class_.__dict__.get('set'))
+    return False
+
+
+def _install_generic(cls):
+    """Shadow the specialised validate and set inherited from a base."""
+    validate_, set_ = Tunable.validate.__func__, Tunable.set.__func__
+
+    def validate(value):
+        return validate_(cls, value)
+
+    def set(value):
+        return set_(cls, value)
+
+    _install(cls, validate, set)
+
+
+def _drop_specialised(cls):
+    for name in ('validate', 'set'):
+        if _is_compiled(cls.__dict__.get(name)):
+            type.__delattr__(cls, name)
+
+    if _inherits_specialised(cls):
+        _install_generic(cls)
+
+
+def _specialised(cls, used):
+    """
+    The specialised (validate, set) of cls, built if the generic function
+    has been used before, or None.
+    """
+    if TunableMeta.compile_hook is None and cls not in used:
+        used.add(cls)
+        return None
+
+    if cls is Tunable:
+        return None
+
+    for class_ in cls.__mro__:
+        if class_ is not Tunable:
+            for name in ('validate', 'set'):
+                attribute = class_.__dict__.get(name)
+                if attribute is not None and not _is_compiled(attribute):
+                    return None  # customized
+
+    if TunableMeta.compile_hook is not None:
+        functions = TunableMeta.compile_hook(cls)
+    else:
+        functions = _specialise(cls)
+
+    _install(cls, *functions)
+
+    return functions
+
+
+class Tunable(object, metaclass=TunableMeta):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        TunableRegistry.add(cls)
+
+        if _inherits_specialised(cls):
+            _install_generic(cls)
+
     @classproperty
     def value(cls):
         return cls.reset()
@@ -64,6 +457,7 @@ class Tunable(object):
     convert_type = True
     range = None
     type_ = None
+    typecode = None  # of array tunables, by default the one of default
 
     hash = True
 
@@ -87,14 +481,43 @@ class Tunable(object):
 
     @classmethod
     def set(cls, value):
+        functions = _specialised(cls, _set)
+        if functions is not None:
+            return functions[1](value)
+
+        value = cls.validate(value)
+        cls._commit(value)
+        return value
 
+    @classmethod
+    def validate(cls, value):
+        """Convert and check value, without setting it."""
+        functions = _specialised(cls, _validated)
+        if functions is not None:
+            return functions[0](value)
+
+        value = cls._convert(value)
+        cls._check_range(value)
+
+        if cls.test is not None and not cls.test(value):
+            raise TunableError('test() failed!')
+
+        return value
+
+    @classmethod
+    def _convert(cls, value):
         if value is None:
             raise TunableError('Tunable has no value', cls)
 
         if cls.type_ is None and cls.convert_type:
-            cls.type_ = type(cls.default)
+            _setattr(cls, 'type_', type(cls.default))
 
-        if cls.type_ is not None and type(value) != cls.type_:
+        if cls.type_ is array:
+            try:
+                value = to_array(value, cls.typecode or cls.default.typecode)
+            except ValueError as e:
+                raise TunableError(e)
+        elif cls.type_ is not None and type(value) != cls.type_:
             try:
                 if cls.type_ in CONVERTERS:
                     value = CONVERTERS[cls.type_](value)
@@ -103,18 +526,33 @@ class Tunable(object):
             except ValueError as e:
                 raise TunableError(e)
 
-        if (
-            cls.range is not None
-            and value not in cls.range
-            and (type(cls.range) == range and value != cls.range.stop)
-        ):
+        return value
+
+    @classmethod
+    def _check_range(cls, value):
+        if cls.type_ is array:
+            if cls.range is not None and not array_in_range(value, cls.range):
+                raise TunableError('Tunable not in range', cls)
+            return
+
+        if cls.range is not None and not range_membership(cls.range)(value):
             raise TunableError('Tunable not in range', cls)
 
-        if cls.test is not None and not cls.test(value):
-            raise TunableError('test() failed!')
+    @classmethod
+    def _commit(cls, value):
+        for commit_hook in TunableMeta._commit_hooks:
+            commit_hook(cls, value)
 
-        cls.value = value
-        return value
+        hook = cls.__dict__.get('value')
+
+        # while a settable classproperty is installed as value
+        # (e.g. an override), the value needs to be stored by it
+        if isinstance(hook, classproperty) and hook.fset is not None:
+            hook.fset(cls, value)
+        else:
+            _setattr(cls, 'value', value)
+
+        TunableRegistry.dirty.add(cls)
 
     def __new__(cls, *args, **kwargs):
         if len(kwargs) == 0:
@@ -133,3 +571,128 @@ class Tunable(object):
                     raise TunableError('Unsupported attribute \"%s\"' % (k,))
 
             return IntermediateTunable
+
+
+# the generic implementations, which _specialise resolves up front; anything
+# else (overridden per class, or replaced on Tunable itself) is called as is
+_GENERIC = {
+    name: Tunable.__dict__[name].__func__
+    for name in ('test', '_convert', '_check_range', '_commit')
+}
+
+
+def _specialised_commit(cls):
+    if cls._commit.__func__ is not _GENERIC['_commit'] or TunableMeta._commit_hooks:
+        return cls._commit
+
+    hook = cls.__dict__.get('value')
+    dirty = TunableRegistry.dirty
+
+    if isinstance(hook, classproperty) and hook.fset is not None:
+        store = hook.fset
+
+        def commit(value):
+            store(cls, value)
+            dirty.add(cls)
+
+    else:
+
+        def commit(value):
+            _setattr(cls, 'value', value)
+            dirty.add(cls)
+
+    return commit
+
+
+def _specialised_convert(cls, type_):
+    """(convert, whether to convert values already of type_)"""
+    if cls._convert.__func__ is not _GENERIC['_convert']:
+        return cls._convert, True
+
+    if type_ is array:
+        typecode = cls.typecode or cls.default.typecode
+
+        def convert(value):
+            return to_array(value, typecode)
+
+        return convert, True
+
+    if type_ is not None:
+        return CONVERTERS.get(type_, type_), False
+
+    return None, False
+
+
+def _specialised_check(cls, type_, range_):
+    if cls._check_range.__func__ is not _GENERIC['_check_range']:
+        return cls._check_range
+
+    if range_ is None:
+        return None
+
+    if type_ is array:
+
+        def contains(value):
+            return array_in_range(value, range_)
+
+    else:
+        contains = range_membership(range_)
+
+    def check(value):
+        if not contains(value):
+            raise TunableError('Tunable not in range', cls)
+
+    return check
+
+
+def _specialise(cls):
+    """
+    Build validate and set of cls with type conversion, range membership and
+    test resolved up front, behaving like the generic Tunable.validate/set.
+    """
+    if cls.type_ is None and cls.convert_type:
+        _setattr(cls, 'type_', type(cls.default))
+
+    type_ = cls.type_
+
+    test = cls.test
+    if getattr(test, '__func__', None) is _GENERIC['test']:
+        test = None  # always True
+
+    validate = _build_validate(
+        cls,
+        type_,
+        *_specialised_convert(cls, type_),
+        _specialised_check(cls, type_, cls.range),
+        test,
+    )
+    commit = _specialised_commit(cls)
+
+    def set(value):
+        value = validate(value)
+        commit(value)
+        return value
+
+    return validate, set
+
+
+def _build_validate(cls, type_, convert, always_convert, check, test):
+    def validate(value):
+        if value is None:
+            raise TunableError('Tunable has no value', cls)
+
+        if convert is not None and (always_convert or type(value) is not type_):
+            try:
+                value = convert(value)
+            except ValueError as e:
+                raise TunableError(e)
+
+        if check is not None:
+            check(value)
+
+        if test is not None and not test(value):
+            raise TunableError('test() failed!')
+
+        return value
+
+    return validate
@@ -1,29 +1,260 @@
-import argparse
-import hashlib
-import json
 import os
-import sys
-import xml.etree.ElementTree as ET
-from base64 import b64encode
+import stat
+from _thread import allocate_lock
+from array import array
+from contextvars import ContextVar
 from io import BytesIO, StringIO
+from keyword import iskeyword
+
+from .arrays import FLOAT_TYPECODES
+from .schema import ASN1_SCHEMA_VERSION, tunable_der
+from .tunable import (
+    TunableError,
+    TunableMeta,
+    TunableRegistry,
+    ValueProperty,
+    classproperty,
+)
+
+# argparse actions are only loaded on first use
+_ACTIONS = {
+    'ShowTunablesAction',
+    'LoadTunablesAction',
+    'SaveTunablesAction',
+    'SetTunableAction',
+    'CompileTunablesAction',
+}
+
+
+def __getattr__(name):
+    if name in _ACTIONS:
+        from . import argparseactions
+
+        return getattr(argparseactions, name)
+
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def _write_atomically(file_name, data):
+    """
+    Write data (bytes or str) to a temporary file next to file_name, then
+    move it over file_name, so that readers never see a partial file. A
+    replaced file keeps its permissions, new ones get 0o666 less the umask.
+    """
+    directory, base = os.path.split(os.path.abspath(file_name))
+
+    try:
+        mode = stat.S_IMODE(os.stat(file_name).st_mode)
+    except FileNotFoundError:
+        mode = None
+
+    # unlike tempfile.mkstemp (always 0o600), os.open applies the umask
+    temporary = os.path.join(directory, '.%s.%s.tmp' % (base, os.urandom(6).hex()))
+    fd = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+
+    try:
+        with os.fdopen(fd, 'wb' if isinstance(data, bytes) else 'w') as fp:
+            fp.write(data)
+        if mode is not None:
+            os.chmod(temporary, mode)
+        os.replace(temporary, file_name)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+_unset = object()
+
+_overrides = ContextVar('tunable_overrides', default=None)
+
+# the origin of values not set by any layer
+DEFAULT_LAYER = 'default'
+
+
+class OverriddenValue(ValueProperty):
+    """
+    Installed as value of a tunable as long as any override of it is active,
+    returns the override of the current context, or the regular value.
+    """
+
+    __slots__ = ('base', 'count')
+
+    def __init__(self, base):
+        super().__init__()
+        self.base = base
+        self.count = 0
+
+    def _get(self, cls):
+        overrides = _overrides.get()
+        if overrides is not None and cls in overrides:
+            return overrides[cls]
+
+        base = self.base
+        if base is _unset:
+            return cls.reset()
+        if isinstance(base, classproperty):
+            return base.fget(cls)
+        return base
+
+    def _set(self, cls, value):
+        if isinstance(self.base, classproperty):
+            self.base.fset(cls, value)
+        else:
+            self.base = value
+
+
+class TunableOverride(object):
+    _lock = allocate_lock()
+
+    def __init__(self, overrides):
+        self.overrides = overrides
+        self.tokens = []
+
+    def _install(self):
+        with self._lock:
+            _check_not_frozen()
+
+            for class_ in self.overrides:
+                hook = class_.__dict__.get('value')
+                if isinstance(hook, classproperty) and hook.fset is None:
+                    raise TunableError(
+                        'Tunable is computed on access and can not be overridden',
+                        class_,
+                    )
+
+            for class_ in self.overrides:
+                hook = class_.__dict__.get('value', _unset)
+
+                if not isinstance(hook, OverriddenValue):
+                    hook = OverriddenValue(hook)
+                    class_.value = hook
+                    TunableRegistry.dirty.add(class_)
+
+                hook.count += 1
+
+    def _uninstall(self):
+        with self._lock:
+            for class_ in self.overrides:
+                hook = class_.__dict__['value']
+                hook.count -= 1
+
+                if hook.count == 0:
+                    if hook.base is _unset:
+                        del class_.value
+                    else:
+                        class_.value = hook.base
+                    TunableRegistry.dirty.add(class_)
+
+    def __enter__(self):
+        self._install()
 
-from .tunable import Tunable, TunableError
+        current = _overrides.get()
+        merged = dict(current) if current else {}
+        merged.update(self.overrides)
 
-try:
-    import pyasn1
-    from pyasn1.codec.der.decoder import decode as der_decode
-    from pyasn1.codec.der.encoder import encode as der_encode
-    from pyasn1.codec.native.encoder import encode as native_encode
+        self.tokens.append(_overrides.set(merged))
+        return self
 
-    from .schema import ASN1_SCHEMA_VERSION
-    from .schema import tunable_schema as schema
-except ImportError:
-    pyasn1 = None
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _overrides.reset(self.tokens.pop())
+        self._uninstall()
 
-try:
-    import yaml
-except ImportError:
-    yaml = None
+
+def _check_not_frozen():
+    if TunableManager.frozen is not None:
+        raise TunableError('Tunables are frozen')
+
+
+def _on_frozen_commit(cls, value):
+    # tunables defined after freezing still get set by their first access
+    if 'value' in cls.__dict__:
+        raise TunableError('Tunables are frozen', cls)
+
+
+class FrozenTunables(object):
+    """
+    Immutable snapshot of all tunable values, see TunableManager.freeze().
+
+    Every tunable is available as attribute by its short name, if that is
+    unambiguous and a valid identifier, and by any of its names as item.
+    """
+
+    __slots__ = ('_values', '_hash')
+
+    def __new__(cls, items, hash_value):
+        """items: sequence of (semilong name, short name, value)."""
+        shorts = {}
+        for _, short, _ in items:
+            shorts[short] = shorts.get(short, 0) + 1
+
+        attributes = {
+            short: value
+            for _, short, value in items
+            if shorts[short] == 1
+            and short.isidentifier()
+            and not iskeyword(short)
+            and not hasattr(FrozenTunables, short)
+        }
+
+        # every snapshot gets its own class, with a slot per tunable
+        class_ = type(
+            cls.__name__, (cls,), dict(__slots__=tuple(attributes), __module__=__name__)
+        )
+
+        self = object.__new__(class_)
+        setter = object.__setattr__
+
+        setter(self, '_values', {name: value for name, _, value in items})
+        setter(self, '_hash', hash_value)
+
+        for name, value in attributes.items():
+            setter(self, name, value)
+
+        return self
+
+    def __setattr__(self, name, value):
+        raise TunableError('Tunables are frozen')
+
+    def __delattr__(self, name):
+        raise TunableError('Tunables are frozen')
+
+    def __getitem__(self, key):
+        if key not in self._values:
+            if not isinstance(key, str):
+                key = TunableRegistry.semilong_name(key)
+            else:
+                key = TunableRegistry.semilong_name(TunableRegistry.lookup(key))
+        return self._values[key]
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except (KeyError, TunableError):
+            return False
+        return True
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __reduce__(self):
+        items = [
+            (name, name.rpartition('.')[2], value)
+            for name, value in self._values.items()
+        ]
+        return FrozenTunables, (items, self._hash)
+
+    def __repr__(self):
+        return '<FrozenTunables %s>' % (self._hash,)
+
+    def items(self):
+        return self._values.items()
+
+    def get_hash(self):
+        """TunableManager.get_hash() at the time of freezing."""
+        return self._hash
 
 
 class Serializer(object):
@@ -35,9 +266,28 @@ class Serializer(object):
     _int = 'intValue'
     _float = 'floatValue'
 
+    _float_array = 'floatArrayValue'
+    _int_array = 'intArrayValue'
+
     type_to_name = {bool: _bool, bytes: _bytes, str: _str, int: _int, float: _float}
 
     simple_types = {_int, _float, _str}
+    array_types = {_float_array, _int_array}
+
+    def get_type_name(self, value):
+        if isinstance(value, array):
+            if value.typecode in FLOAT_TYPECODES:
+                return self._float_array
+            return self._int_array
+
+        return self.type_to_name[type(value)]
+
+    @staticmethod
+    def format_value(value):
+        """Textual form of a value, as understood by Tunable.set."""
+        if isinstance(value, array):
+            return ','.join(str(element) for element in value)
+        return str(value)
 
     def serialize(self, fp, **kwargs):
         pass
@@ -50,6 +300,8 @@ class XmlSerializer(Serializer):
     need_binary = True
 
     def serialize(self, fp, tunables=None, **kwargs):
+        import xml.etree.ElementTree as ET
+
         tl = ET.Element('TunablesList')
         tree = ET.ElementTree(tl)
         version = ET.SubElement(tl, 'version')
@@ -65,12 +317,12 @@ class XmlSerializer(Serializer):
             value = ET.SubElement(tunable, 'value')
 
             the_value = v.value
-            tag_name = self.type_to_name[type(the_value)]
+            tag_name = self.get_type_name(the_value)
 
             inner = ET.SubElement(value, tag_name)
 
-            if tag_name in self.simple_types:
-                inner.text = str(the_value)
+            if tag_name in self.simple_types or tag_name in self.array_types:
+                inner.text = self.format_value(the_value)
             elif tag_name == self._bool:
                 if the_value:
                     ET.SubElement(inner, 'true')
@@ -82,6 +334,8 @@ class XmlSerializer(Serializer):
         tree.write(fp, encoding='utf-8', xml_declaration=True)
 
     def deserialize(self, fp):
+        import xml.etree.ElementTree as ET
+
         tree = ET.parse(fp)
         root = tree.getroot()
 
@@ -97,6 +351,8 @@ class XmlSerializer(Serializer):
 
             if value.tag in self.simple_types:
                 results[name] = value.text
+            elif value.tag in self.array_types:
+                results[name] = value.text or ''
             elif value.tag == self._bool:
                 inner = next(iter(value)).tag
                 assert inner in {'true', 'false'}
@@ -109,26 +365,34 @@ class XmlSerializer(Serializer):
 
 class JsonSerializer(Serializer):
     def serialize(self, fp, representation=None, **kwargs):
+        import json
+
         json.dump(representation, fp, sort_keys=True, indent=4, separators=(',', ': '))
 
     def deserialize(self, fp):
+        import json
+
         return json.load(fp)
 
 
 class YamlSerializer(Serializer):
     def __init__(self):
-        if not yaml:
+        try:
+            import yaml
+        except ImportError:
             raise RuntimeError('yaml library missing!')
 
+        self.yaml = yaml
+
     def serialize(self, fp, representation=None, **kwargs):
-        yaml.dump(representation, fp, default_flow_style=False)
+        self.yaml.dump(representation, fp, default_flow_style=False)
 
     def deserialize(self, fp):
-        return yaml.load(fp)
+        return self.yaml.safe_load(fp)
 
 
 class ConfigSerializer(Serializer):
-    def serialize(self, fp, tunables=None, **kwargs):
+    def serialize(self, fp, tunables=None, origins=None, **kwargs):
         result = ["### Tunables ###", ""]
 
         for k, v in sorted(tunables.items()):
@@ -136,12 +400,17 @@ class ConfigSerializer(Serializer):
             v.value
             if v.documentation:
                 result.append("# %s" % (v.documentation.replace('\n', '\n# '),))
-            result.append("# type: %s" % (v.type_.__name__,))
+            if v.type_ is array:
+                result.append("# type: array('%s')" % (v.value.typecode,))
+            else:
+                result.append("# type: %s" % (v.type_.__name__,))
+            if origins is not None:
+                result.append("# origin: %s" % (origins.get(v, DEFAULT_LAYER),))
             result.append(
                 "%s=%s"
                 % (
                     k,
-                    str(v.value),
+                    self.format_value(v.value),
                 )
             )
             result.append("")
@@ -172,14 +441,14 @@ class ConfigSerializer(Serializer):
 class DerSerializer(Serializer):
     need_binary = True
 
-    def __init__(self):
-        if not pyasn1:
-            raise RuntimeError('pyasn1 library missing!')
+    def encode_tunable(self, name, value):
+        return tunable_der.encode_tunable(name, value)
+
+    def encode_pieces(self, fragments):
+        return tunable_der.encode_pieces(ASN1_SCHEMA_VERSION, fragments)
 
     def encode(self, tunables=None, everything=True, **kwargs):
-        tl = schema.TunablesList()
-        tl['version'] = ASN1_SCHEMA_VERSION
-        tl['tunables'] = schema.TunableSequenceType()
+        fragments = []
 
         # to make it independent of collation rules,
         # sort it by its UTF-8 binary representation
@@ -190,133 +459,102 @@ class DerSerializer(Serializer):
             if not (tunable.hash or everything):
                 continue
 
-            t = schema.Tunable()
-
-            tv = schema.TunableType()
-            tv[self.type_to_name[type(value)]] = value
-
-            t['name'] = name
-            t['value'] = tv
+            fragments.append(self.encode_tunable(name, value))
 
-            tl['tunables'].append(t)
-
-        return der_encode(tl)
+        return b''.join(self.encode_pieces(fragments))
 
     def serialize(self, fp, tunables=None, **kwargs):
         fp.write(self.encode(tunables=tunables, **kwargs))
 
     def decode(self, data):
-        decode_result, _ = der_decode(data, asn1Spec=schema.TunablesList())
-
-        assert decode_result['version'] == ASN1_SCHEMA_VERSION
+        version, tunables = tunable_der.decode(data)
 
-        result = {}
+        assert version == ASN1_SCHEMA_VERSION
 
-        for tunable in decode_result['tunables']:
-            result[tunable['name']] = next(
-                iter(native_encode(tunable['value']).values())
-            )
-
-        return result
+        return dict(tunables)
 
     def deserialize(self, fp):
         return self.decode(fp.read())
 
 
-SERIALIZERS = {
-    'json': JsonSerializer,
-    'yaml': YamlSerializer,
-    'conf': ConfigSerializer,
-    'der': DerSerializer,
-    'xml': XmlSerializer,
-}
-
-
-class ShowTunablesAction(argparse._StoreTrueAction):
-    quit_after_call = True  # False
-
-    def __call__(self, parser, namespace, values, option_string=None):
-        cs = ConfigSerializer()
-
-        cs.serialize(sys.stdout, TunableManager.get_semilong_dict())
+class PyAsn1DerSerializer(DerSerializer):
+    """
+    DerSerializer based upon pyasn1 and the generated schema,
+    serves as reference implementation for the native one.
+    """
 
-        if self.__class__.quit_after_call:
-            sys.exit(1)
+    def __init__(self):
+        try:
+            import pyasn1  # noqa: F401
+        except ImportError:
+            raise RuntimeError('pyasn1 library missing!')
 
+    def encode_tunable(self, name, value):
+        from pyasn1.codec.der.encoder import encode as der_encode
 
-class LoadTunablesAction(argparse.Action):
-    def __call__(self, parser, namespace, values, option_string=None):
-        file_name = os.path.abspath(values)
+        from .schema import tunable_schema as schema
 
-        ext = os.path.splitext(file_name)
-        ext = ext[1][1:].lower()
+        t = schema.Tunable()
 
-        if ext not in SERIALIZERS:
-            raise RuntimeError("Unsupported format %s." % (ext,))
+        tv = schema.TunableType()
+        type_name = self.get_type_name(value)
 
-        s = SERIALIZERS[ext]()
+        if type_name in self.array_types:
+            _, value = tunable_der.array_to_bytes(value)
 
-        with open(file_name, 'rb' if s.need_binary else 'r') as fp:
-            TunableManager.load(s.deserialize(fp))
+        tv[type_name] = value
 
+        t['name'] = name
+        t['value'] = tv
 
-class SaveTunablesAction(argparse.Action):
-    quit_after_call = True  # False
-    prompt_overwrite = True  # False
+        return der_encode(t)
 
-    def finish(self):
-        if self.__class__.quit_after_call:
-            sys.exit(1)
+    def decode(self, data):
+        from pyasn1.codec.der.decoder import decode as der_decode
+        from pyasn1.codec.native.encoder import encode as native_encode
 
-    def __call__(self, parser, namespace, values, option_string=None):
-        file_name = os.path.abspath(values)
+        from .schema import tunable_schema as schema
 
-        ext = os.path.splitext(file_name)
-        ext = ext[1][1:].lower()
+        decode_result, _ = der_decode(data, asn1Spec=schema.TunablesList())
 
-        if os.path.exists(file_name):
-            if self.__class__.prompt_overwrite:
-                while True:
-                    print("File \"%s\" already exists. Overwrite? [y/n]" % (file_name,))
-                    result = input().lower()
-                    if result in ['y', 'n']:
-                        break
+        assert decode_result['version'] == ASN1_SCHEMA_VERSION
 
-                if result != 'y':
-                    return self.finish()
-            else:
-                return self.finish()
+        result = {}
 
-        if ext not in SERIALIZERS:
-            raise RuntimeError("Unsupported format %s." % (ext,))
+        for tunable in decode_result['tunables']:
+            ((type_name, value),) = native_encode(tunable['value']).items()
 
-        s = SERIALIZERS[ext]()
+            if type_name in self.array_types:
+                value = tunable_der.bytes_to_array(
+                    value, type_name == self._float_array
+                )
 
-        # TODO: call get_serialization()?
+            result[tunable['name']] = value
 
-        print("Saving tunables to \"%s\" ..." % (file_name,))
+        return result
 
-        with open(file_name, 'wb+' if s.need_binary else 'w+') as fp:
-            s.serialize(
-                fp,
-                representation=TunableManager.get_representation(),
-                tunables=TunableManager.get_semilong_dict(),
-            )
 
-        self.finish()
+SERIALIZERS = {
+    'json': JsonSerializer,
+    'yaml': YamlSerializer,
+    'conf': ConfigSerializer,
+    'der': DerSerializer,
+    'xml': XmlSerializer,
+}
 
 
-class SetTunableAction(argparse.Action):
-    def __call__(self, parser, namespace, values, option_string=None):
-        pieces = values.split('=')
+_freeze_lock = allocate_lock()
 
-        k = pieces[0]
-        remainder = '='.join(pieces[1:])
 
-        TunableManager.set(k, remainder)
+class TunableManager(object):
+    # the FrozenTunables snapshot, while frozen
+    frozen = None
 
+    # class -> name of the layer its value came from, see tunable.layers
+    origins = {}
+    # TunableLayers collected while parsing arguments
+    pending_layers = None
 
-class TunableManager(object):
     @classmethod
     def register_argparser(cls, parser, register=None):
         if register is None:
@@ -325,8 +563,43 @@ class TunableManager(object):
                 'set': ('t', 'tunable'),
                 'load': (None, 'tunables-load'),
                 'save': (None, 'tunables-save'),
+                'sweep': (None, 'tunables-sweep'),
+                'compile': (None, 'tunables-compile'),
             }
 
+        cls._argument_names(parser, register)
+
+        from .argparseactions import (
+            CompileTunablesAction,
+            LoadTunablesAction,
+            SaveTunablesAction,
+            SetTunableAction,
+            ShowTunablesAction,
+            SweepTunablesAction,
+        )
+
+        if register['set']:
+            parser.add_argument(*register['set'], type=str, action=SetTunableAction)
+        if register['show']:
+            parser.add_argument(*register['show'], action=ShowTunablesAction)
+        if register['load']:
+            parser.add_argument(*register['load'], type=str, action=LoadTunablesAction)
+        if register['save']:
+            parser.add_argument(*register['save'], type=str, action=SaveTunablesAction)
+        if register.get('sweep'):
+            parser.add_argument(
+                *register['sweep'], type=str, action=SweepTunablesAction
+            )
+        if register.get('compile'):
+            parser.add_argument(
+                *register['compile'], type=str, action=CompileTunablesAction
+            )
+
+        cls._collect_layers(parser)
+
+    @staticmethod
+    def _argument_names(parser, register):
+        """Turn the (short, long) names of register into option strings."""
         p = parser.prefix_chars[0:1]
         prefix = p * 2
 
@@ -346,102 +619,385 @@ class TunableManager(object):
 
             register[k] = v
 
-        if register['set']:
-            parser.add_argument(*register['set'], type=str, action=SetTunableAction)
-        if register['show']:
-            parser.add_argument(*register['show'], action=ShowTunablesAction)
-        if register['load']:
-            parser.add_argument(*register['load'], type=str, action=LoadTunablesAction)
-        if register['save']:
-            parser.add_argument(*register['save'], type=str, action=SaveTunablesAction)
+    @classmethod
+    def _collect_layers(cls, parser):
+        """
+        Files and values are collected while parsing, and resolved at once
+        afterwards, see tunable.layers.
+        """
+        real_parse_known_args = parser.parse_known_args
+
+        def _layered_parse_known_args(args=None, namespace=None):
+            from .layers import TunableLayers
+
+            cls.pending_layers = TunableLayers()
+            try:
+                result = real_parse_known_args(args, namespace)
+                cls.resolve_pending()
+            finally:
+                cls.pending_layers = None
+
+            return result
+
+        parser.parse_known_args = _layered_parse_known_args
+
+    @classmethod
+    def resolve_pending(cls):
+        """
+        Resolve the layers collected while parsing so far, if any; the
+        remaining arguments are applied directly.
+        """
+        layers, cls.pending_layers = cls.pending_layers, None
+        if layers is not None:
+            layers.resolve()
+
+    @classmethod
+    def get_origin(cls, key):
+        """Name of the layer the tunable's value came from."""
+        return cls.origins.get(TunableRegistry.lookup(key), DEFAULT_LAYER)
 
     @classmethod
     def load(cls, tunables, reset=True):
-        if reset:
-            cls.init()
+        cls.load_many(tunables, reset=reset)
+
+    @staticmethod
+    def get_serializer(file_name):
+        """A serializer instance for the file's extension."""
+        ext = os.path.splitext(file_name)[1][1:].lower()
+
+        if ext not in SERIALIZERS:
+            raise TunableError("Unsupported format %s." % (ext,))
+
+        return SERIALIZERS[ext]()
+
+    @classmethod
+    def load_file(cls, file_name, reset=True):
+        """
+        Load tunables from a file, in the format given by its extension.
+        Compiled snapshots (.tunc) are loaded without any parsing or
+        validation, as long as they are still valid.
+        """
+        from .compiled import CompiledTunables
+
+        if file_name.lower().endswith('.' + CompiledTunables.extension):
+            return CompiledTunables.load(file_name, reset=reset)
+
+        s = cls.get_serializer(file_name)
+
+        with open(file_name, 'rb' if s.need_binary else 'r') as fp:
+            return cls.load_many(s.deserialize(fp), reset=reset)
+
+    @classmethod
+    async def aload(cls, path_or_paths, reset=True, executor=None):
+        """
+        Load one or more files from asyncio code (see tunable.aio): they are
+        read concurrently in the executor, then applied at once on the loop.
+        """
+        from .aio import AsyncTunables
+
+        return await AsyncTunables.load(path_or_paths, reset=reset, executor=executor)
+
+    @classmethod
+    async def asave(cls, path_or_paths, fmt=None, overwrite=True, executor=None):
+        """Save to one or more files from asyncio code, see tunable.aio."""
+        from .aio import AsyncTunables
+
+        await AsyncTunables.save(
+            path_or_paths, fmt=fmt, overwrite=overwrite, executor=executor
+        )
+
+    @classmethod
+    def watch(cls, file_name, interval=1.0, callback=None):
+        """
+        Apply changes of a tunable file as soon as it gets modified, returns
+        the started TunableWatcher (see tunable.watch), stop() ends watching.
+        """
+        from .watch import TunableWatcher
+
+        return TunableWatcher(file_name, interval=interval, callback=callback).start()
+
+    @classmethod
+    def serve(cls, address=('127.0.0.1', 0)):
+        """
+        Serve the tunables over HTTP, returns the started TunableServer (see
+        tunable.remote), stop() ends serving.
+        """
+        from .remote import TunableServer
+
+        return TunableServer(address).start()
+
+    @classmethod
+    def poll(cls, url, interval=10.0, callback=None):
+        """
+        Follow the tunables served at url by a TunableServer, returns the
+        started TunablePoller, stop() ends polling.
+        """
+        from .remote import TunablePoller
+
+        return TunablePoller(url, interval=interval, callback=callback).start()
+
+    @classmethod
+    def load_many(cls, tunables, reset=True, diff=False, validate=True):
+        """
+        Set multiple tunables at once, transactionally.
+
+        All values are converted and validated first, if any of them fail,
+        nothing is changed and a single TunableError listing every failing
+        key is raised. If reset is set, all other tunables are reset to their
+        defaults. If diff is set, only tunables whose value actually changes
+        are touched. If validate is not set, the passed values must already
+        be converted and checked (e.g. restored from a compiled snapshot).
+
+        Returns the list of keys (or names of reset tunables) that were set.
+        """
+        _check_not_frozen()
+
+        pending = cls._validate_many(tunables, reset=reset, validate=validate)
+
+        if diff:
+            pending = {
+                class_: (key, value)
+                for class_, (key, value) in pending.items()
+                if cls._stored_value(class_) != value
+            }
+
+        previous = {class_: class_.__dict__.get('value', _unset) for class_ in pending}
+        previous_bases = {
+            class_: hook.base
+            for class_, hook in previous.items()
+            if isinstance(hook, OverriddenValue)
+        }
+
+        try:
+            for class_, (_, value) in pending.items():
+                class_._commit(value)
+        except BaseException:
+            cls._rollback(previous, previous_bases)
+            raise
+
+        if cls.origins:
+            for class_ in pending:
+                cls.origins.pop(class_, None)
+
+        return [key for key, _ in pending.values()]
+
+    @staticmethod
+    def _rollback(previous, previous_bases):
+        """Restore the value hooks (and overridden base values) of load_many."""
+        for class_, value in previous.items():
+            if class_ in previous_bases:
+                value.base = previous_bases[class_]
+            elif value is _unset:
+                if 'value' in class_.__dict__:
+                    delattr(class_, 'value')
+            else:
+                setattr(class_, 'value', value)
+
+    @staticmethod
+    def _validate_many(tunables, reset=False, validate=True):
+        """
+        Resolve and validate all passed values (and the defaults of all others
+        if reset is set), returns {class: (key, value)} or raises TunableError.
+        """
+        errors = {}
+        pending = {}
 
         for key, value in tunables.items():
-            cls.set(key, value)
+            try:
+                class_ = TunableRegistry.lookup(key)
+                pending[class_] = (key, class_.validate(value) if validate else value)
+            except (TunableError, TypeError, ValueError) as e:
+                errors[key] = e
+
+        if reset:
+            for class_ in TunableRegistry.sorted_classes():
+                if class_ in pending:
+                    continue
+                key = TunableRegistry.semilong_name(class_)
+                try:
+                    pending[class_] = (key, class_.validate(class_.default))
+                except (TunableError, TypeError, ValueError) as e:
+                    errors[key] = e
+
+        if errors:
+            raise TunableError(
+                "Could not set tunables:\n%s"
+                % '\n'.join("  %s: %s" % (k, e) for k, e in sorted(errors.items())),
+                errors,
+            )
+
+        return pending
 
     @classmethod
-    def set(cls, key, value):
-        existing = cls.get_multi_dict()
+    def override(cls, tunables):
+        """
+        Context manager overriding tunables only for the current thread or
+        asyncio task (and tasks created within), backed by contextvars::
+
+            with TunableManager.override({'SomeTunable': 2.0}):
+                ...
+
+        Values are validated upon creation. While no override is active,
+        tunables are not affected at all.
+        """
+        return TunableOverride(
+            {
+                class_: value
+                for class_, (key, value) in cls._validate_many(tunables).items()
+            }
+        )
 
-        if key not in existing:
-            raise TunableError("Tunable \"%s\" does not exist." % (key,))
+    @classmethod
+    def freeze(cls):
+        """
+        Freeze all tunables at their current values and return them as
+        FrozenTunables, an immutable snapshot whose attributes are cheap to
+        read (e.g. within hot loops) and which can be shared across threads.
+
+        Afterwards, setting any tunable (as well as loading or overriding)
+        raises a TunableError, until unfreeze() is called. Freezing again
+        returns the same snapshot.
+        """
+        with _freeze_lock:
+            if cls.frozen is not None:
+                return cls.frozen
+
+            items = []
+            for class_ in TunableRegistry.sorted_classes():
+                if isinstance(class_.__dict__.get('value'), OverriddenValue):
+                    raise TunableError('Tunable is overridden', class_)
+
+                value = class_.value  # also sets not yet accessed tunables
+                if isinstance(value, array):
+                    value = value[:]  # not affected by changes in place
+
+                items.append(
+                    (
+                        TunableRegistry.semilong_name(class_),
+                        TunableRegistry.short_name(class_),
+                        value,
+                    )
+                )
 
-        class_ = existing[key]
+            frozen = FrozenTunables(items, cls.get_hash())
+
+            TunableMeta.add_commit_hook(_on_frozen_commit)
+
+            cls.frozen = frozen
+            return frozen
+
+    @classmethod
+    def unfreeze(cls):
+        with _freeze_lock:
+            if cls.frozen is None:
+                return
 
-        class_.set(value)
+            TunableMeta.remove_commit_hook(_on_frozen_commit)
+            cls.frozen = None
+
+    @classmethod
+    def apply(cls, tunables):
+        """Set only those of the passed tunables whose value changes."""
+        return cls.load_many(tunables, reset=False, diff=True)
+
+    @classmethod
+    def get_state(cls):
+        """
+        Return all tunable values which have been set (or accessed) as tuple
+        of (name, value) pairs, tunables computed upon access are skipped.
+        """
+        state = []
+        for class_ in TunableRegistry.sorted_classes():
+            value = cls._stored_value(class_)
+            if value is not _unset:
+                state.append((TunableRegistry.semilong_name(class_), value))
+        return tuple(state)
+
+    @classmethod
+    def set_state(cls, state):
+        """Restore values from get_state(), they are not validated again."""
+        _check_not_frozen()
+
+        for name, value in state:
+            TunableRegistry.lookup(name)._commit(value)
+
+    @staticmethod
+    def _stored_value(class_):
+        value = class_.__dict__.get('value', _unset)
+        if isinstance(value, OverriddenValue):
+            value = value.base
+        if isinstance(value, classproperty):
+            # settable ones store the value elsewhere, others compute it
+            return value.fget(class_) if value.fset is not None else _unset
+        return value
+
+    @classmethod
+    def set(cls, key, value):
+        TunableRegistry.lookup(key).set(value)
+
+    @classmethod
+    def lookup(cls, key):
+        return TunableRegistry.lookup(key)
 
     @classmethod
     def init(cls):
-        for class_ in cls.get_multi_dict().values():
+        for class_ in cls.get_classes():
             class_.reset()
 
     @classmethod
     def get_representation(cls):
-        return {k: v.value for k, v in cls.get_semilong_dict().items()}
+        result = {k: v.value for k, v in cls.get_semilong_dict().items()}
+
+        for k, v in result.items():
+            if isinstance(v, array):
+                result[k] = v.tolist()
+
+        return result
 
     @classmethod
     def get_classes(cls):
-        collection = set()
-
-        def descent(p):
-            sub = p.__subclasses__()
-            if len(sub) == 0:
-                collection.add(p)
-            else:
-                for p in sub:
-                    descent(p)
-
-        descent(Tunable)
-        collection -= {Tunable}
-
-        return list(
-            sorted(
-                collection,
-                key=lambda p: (
-                    p.__module__,
-                    p.__name__,
-                ),
-            )
-        )
+        return list(TunableRegistry.sorted_classes())
 
     @classmethod
-    def get_short_dict(cls):
-        return {class_.__name__: class_ for class_ in cls.get_classes()}
+    def get_collisions(cls):
+        return TunableRegistry.collisions()
 
     @classmethod
-    def get_long_dict(cls):
+    def get_short_dict(cls):
         return {
-            class_.__module__ + '.' + class_.__name__: class_
-            for class_ in cls.get_classes()
+            TunableRegistry.short_name(class_): class_
+            for class_ in TunableRegistry.sorted_classes()
         }
 
-    @staticmethod
-    def _strip_main(kv):
+    @classmethod
+    def get_long_dict(cls):
         return {
-            (k[len('__main__.') :] if '__main__.' in k else k): v for k, v in kv.items()
+            TunableRegistry.long_name(class_): class_
+            for class_ in TunableRegistry.sorted_classes()
         }
 
     @classmethod
     def get_semilong_dict(cls):
-        return cls._strip_main(cls.get_long_dict())
+        return {
+            TunableRegistry.semilong_name(class_): class_
+            for class_ in TunableRegistry.sorted_classes()
+        }
 
     @classmethod
     def get_multi_dict(cls):
         merged = {}
-        long = cls.get_long_dict()
-        merged.update(long)
-        merged.update(cls._strip_main(long))
         merged.update(cls.get_short_dict())
+        merged.update(cls.get_semilong_dict())
+        merged.update(cls.get_long_dict())
 
         return merged
 
     @classmethod
     def get(cls):
-        return list(cls.get_long_dict().keys())
+        return [
+            TunableRegistry.long_name(class_)
+            for class_ in TunableRegistry.sorted_classes()
+        ]
 
     @classmethod
     def get_serialization(cls, extension='conf'):
@@ -462,13 +1018,111 @@ class TunableManager(object):
 
         return buf.getvalue()
 
+    _hash_value = None
+    _hash_generation = None
+    _hash_order = []
+    _hash_fragments = {}
+    _hash_lock = allocate_lock()
+
+    @staticmethod
+    def _hash_fragment(serializer, class_):
+        if not class_.hash:
+            return None
+        return serializer.encode_tunable(
+            TunableRegistry.semilong_name(class_), class_.value
+        )
+
+    @staticmethod
+    def _hash_digest(serializer, fragments):
+        import hashlib
+        from base64 import b64encode
+
+        hasher = hashlib.sha256()
+        for piece in serializer.encode_pieces(
+            [fragment for fragment in fragments if fragment is not None]
+        ):
+            hasher.update(piece)
+
+        return "VERSION:%d:SHA256:%s" % (
+            ASN1_SCHEMA_VERSION,
+            b64encode(hasher.digest()).decode(),
+        )
+
+    @staticmethod
+    def _hash_sorted(classes):
+        # to make it independent of collation rules,
+        # sort it by its UTF-8 binary representation
+        return sorted(classes, key=lambda c: TunableRegistry.semilong_name(c).encode())
+
+    @classmethod
+    def _update_hash_fragments(cls, serializer):
+        registry = TunableRegistry
+        fragments = cls._hash_fragments
+
+        if cls._hash_generation != registry.generation:
+            cls._hash_value = None
+            cls._hash_order = cls._hash_sorted(registry.classes)
+            for class_ in set(fragments) - set(registry.classes):
+                del fragments[class_]
+            cls._hash_generation = registry.generation
+
+        # taken (and cleared) before reading any value, so that values
+        # committed meanwhile (e.g. by other threads) remain dirty
+        dirty = set(registry.dirty)
+        registry.dirty.difference_update(dirty)
+        stale = dirty | registry.volatile
+
+        for class_ in stale:
+            if class_ not in registry.classes:
+                continue
+
+            fragment = cls._hash_fragment(serializer, class_)
+
+            if fragments.get(class_, b'') != fragment:
+                fragments[class_] = fragment
+                cls._hash_value = None
+
+        # tunables which are only (re)set upon access will be checked every time
+        registry.volatile = {
+            class_
+            for class_ in stale
+            if isinstance(class_.__dict__.get('value'), classproperty)
+        }
+
+    @classmethod
+    def _uncached_hash(cls, serializer):
+        return cls._hash_digest(
+            serializer,
+            [
+                cls._hash_fragment(serializer, class_)
+                for class_ in cls._hash_sorted(TunableRegistry.classes)
+            ],
+        )
+
     @classmethod
     def get_hash(cls):
+        frozen = cls.frozen
+        if frozen is not None:
+            return frozen.get_hash()
+
+        registry = TunableRegistry
         serializer = DerSerializer()
-        data = serializer.encode(tunables=cls.get_semilong_dict(), everything=False)
 
-        hasher = hashlib.sha256()
-        hasher.update(data)
-        hash_value = b64encode(hasher.digest()).decode()
+        # the cache holds the regular values, overrides of the current
+        # context are hashed without it
+        if _overrides.get():
+            return cls._uncached_hash(serializer)
+
+        with cls._hash_lock:
+            if registry.dirty or registry.volatile:
+                cls._update_hash_fragments(serializer)
+            elif cls._hash_generation != registry.generation:
+                cls._update_hash_fragments(serializer)
+
+            if cls._hash_value is None:
+                cls._hash_value = cls._hash_digest(
+                    serializer,
+                    [cls._hash_fragments[class_] for class_ in cls._hash_order],
+                )
 
-        return "VERSION:%d:SHA256:%s" % (ASN1_SCHEMA_VERSION, hash_value)
+            return cls._hash_value
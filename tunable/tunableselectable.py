@@ -3,20 +3,130 @@
 documentation
 """
 
+import importlib
+import sys
+
 from .modulehelper import ModuleHelper
 from .selectable import Selectable, SelectableManager
 from .tunable import Tunable
 from .tunablemanager import TunableError, TunableManager
 
 
+def class_to_name(class_):
+    return '%s:%s' % (class_.__module__, class_.__qualname__)
+
+
+def name_to_class(name):
+    module_name, qualname = name.split(':')
+
+    if module_name in sys.modules:
+        result = sys.modules[module_name]
+    else:
+        result = importlib.import_module(module_name)
+
+    for piece in qualname.split('.'):
+        result = getattr(result, piece)
+
+    return result
+
+
+class CommonState(object):
+    """
+    Picklable snapshot of all tunable values and selectable choices,
+    classes are referenced by qualified name.
+    """
+
+    __slots__ = ('tunables', 'overrides', 'parameters')
+
+    def __init__(self, tunables=(), overrides=(), parameters=()):
+        self.tunables = tunables
+        self.overrides = overrides
+        self.parameters = parameters
+
+    def __getstate__(self):
+        return self.tunables, self.overrides, self.parameters
+
+    def __setstate__(self, state):
+        self.tunables, self.overrides, self.parameters = state
+
+    def __eq__(self, other):
+        return isinstance(other, CommonState) and (
+            self.__getstate__() == other.__getstate__()
+        )
+
+    def __repr__(self):
+        return '%s(tunables=%r, overrides=%r, parameters=%r)' % (
+            self.__class__.__name__,
+            self.tunables,
+            self.overrides,
+            self.parameters,
+        )
+
+
 class TunableSelectable(object):
     @classmethod
     def get_common_state(cls):
-        return {'selectable': 1, 'tunable': 1}
+        overrides = []
+        for selectable, choice in Selectable.SelectableChoice.overrides.items():
+            if isinstance(choice, list):
+                choice = tuple(class_to_name(c) for c in choice)
+            else:
+                choice = class_to_name(choice)
+            overrides.append((class_to_name(selectable), choice))
+
+        parameters = tuple(
+            (class_to_name(choice), dict(choice_parameters))
+            for choice, choice_parameters in (
+                Selectable.SelectableChoice.parameters.items()
+            )
+        )
+
+        return CommonState(
+            tunables=TunableManager.get_state(),
+            overrides=tuple(overrides),
+            parameters=parameters,
+        )
 
     @classmethod
     def set_common_state(cls, state):
-        pass
+        TunableManager.set_state(state.tunables)
+
+        overrides = Selectable.SelectableChoice.overrides
+        overrides.clear()
+        for selectable, choice in state.overrides:
+            if isinstance(choice, tuple):
+                choice = [name_to_class(c) for c in choice]
+            else:
+                choice = name_to_class(choice)
+            overrides[name_to_class(selectable)] = choice
+
+        parameters = Selectable.SelectableChoice.parameters
+        parameters.clear()
+        for choice, choice_parameters in state.parameters:
+            parameters[name_to_class(choice)] = dict(choice_parameters)
+
+        SelectableManager.clear_shared()
+
+    @classmethod
+    def _initialize_worker(cls, state, initializer, initargs):
+        cls.set_common_state(state)
+        if initializer is not None:
+            initializer(*initargs)
+
+    @classmethod
+    def get_pool_kwargs(cls, initializer=None, initargs=()):
+        """
+        Return initializer/initargs keyword arguments for multiprocessing.Pool
+        or concurrent.futures.ProcessPoolExecutor, which restore the current
+        common state once per worker::
+
+            with ProcessPoolExecutor(**TunableSelectable.get_pool_kwargs()) as e:
+                ...
+        """
+        return dict(
+            initializer=cls._initialize_worker,
+            initargs=(cls.get_common_state(), initializer, initargs),
+        )
 
     @classmethod
     def setup_and_parse(cls, parser, args=None):
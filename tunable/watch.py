@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+Hot reloading of tunable files.
+
+A TunableWatcher polls a tunable file's mtime (and size) in a background
+thread. Upon a change, the file is deserialized again and only the changed
+tunables are applied, transactionally; tunables removed from the file are
+reset to their defaults. If the file can not be read or fails validation,
+the current values are kept::
+
+    watcher = TunableManager.watch('config.yaml', callback=print)
+    ...
+    watcher.stop()
+"""
+
+import os
+import threading
+from collections import namedtuple
+from time import perf_counter
+
+from .tunablemanager import TunableManager
+
+ReloadReport = namedtuple('ReloadReport', ['path', 'changed', 'latency', 'error'])
+
+
+class PeriodicReloader(object):
+    """
+    Base of reloaders calling check() every interval seconds in a background
+    thread. callback(report) is called with the ReloadReport of every reload
+    attempt.
+    """
+
+    def __init__(self, path, interval, callback):
+        self.path = path
+        self.interval = interval
+        self.callback = callback
+
+        self.reloads = 0
+        self.failures = 0
+        self.last_report = None
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    def check(self):
+        """Reload if anything changed, returns a ReloadReport or None."""
+        raise NotImplementedError
+
+    def _report(self, start, changed, error):
+        report = ReloadReport(self.path, changed, perf_counter() - start, error)
+
+        self.reloads += 1
+        if error is not None:
+            self.failures += 1
+        self.last_report = report
+
+        if self.callback is not None:
+            self.callback(report)
+
+        return report
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name=type(self).__name__, daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+class TunableWatcher(PeriodicReloader):
+    """
+    Watches path, checking every interval seconds. callback(report) is
+    called with a ReloadReport after every reload attempt, listing the
+    changed keys and the time reloading took (or the error that occurred).
+    """
+
+    def __init__(self, path, interval=1.0, callback=None):
+        super().__init__(os.path.abspath(path), interval, callback)
+
+        self.serializer = TunableManager.get_serializer(self.path)
+
+        self._signature = self._stat()
+        # the file's contents as of the last successful (re)load
+        self._values = self._read()
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None  # e.g. while being replaced
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _read(self):
+        with open(self.path, 'rb' if self.serializer.need_binary else 'r') as fp:
+            return self.serializer.deserialize(fp)
+
+    def check(self):
+        """Reload the file if it changed, returns a ReloadReport or None."""
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return None
+
+        start = perf_counter()
+        changed, error = [], None
+
+        try:
+            values = self._read()
+
+            if self._stat() != signature:
+                return None  # still being written, retried on the next check
+
+            update = dict(values)
+            for key in set(self._values) - set(values):
+                update[key] = TunableManager.lookup(key).default
+
+            changed = TunableManager.apply(update)
+            self._values = values
+        except Exception as e:  # any deserializer error, keeping the old state
+            error = e
+
+        self._signature = signature
+
+        return self._report(start, changed, error)